@@ -10,7 +10,7 @@ PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__)))
 SRC_PATH = os.path.join(PROJECT_ROOT, "src")
 sys.path.insert(0, SRC_PATH)
 
-from src.simulator.simulate import run_simulation
+from src.simulator.simulate import run_simulation_tables
 from src.pipeline import LearningPathPipeline
 from src.config import (
     NUM_USERS, NUM_ITEMS, STEPS_PER_USER, RANDOM_SEED,
@@ -27,14 +27,14 @@ def main():
     
     # Step 1: Generate synthetic data (users, items, interactions)
     print("\n[Step 1] Generating synthetic users, items, and interactions...")
-    users, items, logs = run_simulation(
+    users, items, logs = run_simulation_tables(
         num_users=NUM_USERS,
         num_items=NUM_ITEMS,
         steps_per_user=STEPS_PER_USER,
         seed=RANDOM_SEED
     )
-    print(f"    Users: {len(users)}")
-    print(f"    Items: {len(items)}")
+    print(f"    Users: {len(users.user_ids)}")
+    print(f"    Items: {len(items.item_ids)}")
     print(f"    Interactions: {len(logs)}")
     
     # Step 2: Run the pipeline
@@ -79,7 +79,7 @@ def main():
     if user_0_recs is not None and len(user_0_recs) > 0:
         for idx, row in user_0_recs.iterrows():
             item_id = int(row['item_id'])
-            item = items[item_id]
+            item = items.as_dict(items.id_to_idx[item_id])
             print(f"  Rank {int(row['rank'])}: Item {item_id} - Score: {row['relevance_score']:.3f}")
             print(f"    Skills: {sum(item['skills'])}, Difficulty: {item['difficulty']}")
     else:
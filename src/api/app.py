@@ -2,11 +2,21 @@
 
 from fastapi import FastAPI, HTTPException, Path
 from pydantic import BaseModel
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import asyncio
+import os
+import queue
+import time
 import numpy as np
+import pandas as pd
 
 from ..model.persistence import ModelPersistence, load_pipeline_models
-from ..config import TOP_K, MIN_RELEVANCE_THRESHOLD
+from ..catalog import UsersTable
+from ..features.soa import build_soa
+from ..features.candidate_features import align_item_stats, candidate_feature_matrix
+from ..config import NUM_USERS, TOP_K, MIN_RELEVANCE_THRESHOLD, RECOMMENDATION_CACHE_SIZE
 
 
 # Response models
@@ -37,11 +47,19 @@ app = FastAPI(
 )
 
 
-@app.on_event("startup")
-async def startup_event():
-    """Load trained models on startup."""
+# Serializes model (re)loads so concurrent reloads never interleave
+_model_lock = asyncio.Lock()
+
+
+def _load_models() -> None:
+    """Load trained models into app.state (blocking disk I/O)."""
+    # Cached contexts and responses were produced by the previous models
+    _user_context.cache_clear()
+    _generate_recommendations.cache_clear()
+    
     try:
         app.state.persistence = ModelPersistence()
+        app.state.available_models = app.state.persistence.list_models()
         models = load_pipeline_models(app.state.persistence)
         
         if not models:
@@ -58,6 +76,29 @@ async def startup_event():
             print("WARNING: Ranking model not found.")
             return
         
+        context_names = ('users', 'items', 'user_features', 'item_features')
+        if any(name not in models for name in context_names):
+            app.state.models_loaded = False
+            print("WARNING: Serving context not found. Run: python train_and_save_models.py")
+            return
+        
+        # Catalog arrays and item history are shared by every request
+        users = models['users']
+        app.state.users = users if isinstance(users, UsersTable) else UsersTable.from_dicts(users)
+        app.state.soa = build_soa(models['users'], models['items'])
+        app.state.item_stats = align_item_stats(models['item_features'], app.state.soa)
+        app.state.user_stats = models['user_features'].set_index('user_id').to_dict('index')
+        
+        # Reusable (num_items, F) feature matrices, one per scoring thread
+        shape = (len(app.state.soa.item_ids), len(app.state.feature_columns))
+        app.state.feature_buffers = queue.SimpleQueue()
+        for _ in range(os.cpu_count() or 1):
+            app.state.feature_buffers.put(np.empty(shape, dtype=np.float32))
+        
+        # Models stay referenced from app.state for the worker's lifetime;
+        # one dummy prediction pays any lazy initialization before real traffic
+        _warm_up_model()
+        
         app.state.models_loaded = True
         print("✓ Models loaded successfully")
     
@@ -66,13 +107,37 @@ async def startup_event():
         print(f"ERROR loading models: {e}")
 
 
+def _warm_up_model() -> None:
+    """Run one prediction on a dummy row so the first request is not slow."""
+    start = time.perf_counter()
+    dummy = np.zeros((1, len(app.state.feature_columns)), dtype=np.float32)
+    if app.state.scaler is not None:
+        dummy = app.state.scaler.transform(_as_fitted_input(app.state.scaler, dummy))
+    app.state.ranking_model.predict(_as_fitted_input(app.state.ranking_model, dummy))
+    print(f"✓ Model warm-up took {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+@app.on_event("startup")
+async def startup_event():
+    """Load trained models on startup."""
+    # CPU-bound recommendation work runs in this pool via asyncio.to_thread
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=os.cpu_count())
+    )
+    app.state.models_loaded = False
+    app.state.available_models = []
+    
+    async with _model_lock:
+        await asyncio.to_thread(_load_models)
+
+
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     """Check API status and loaded models."""
     return HealthResponse(
         status="healthy",
         models_loaded=app.state.models_loaded,
-        available_models=app.state.persistence.list_models() if app.state.persistence else []
+        available_models=app.state.available_models
     )
 
 
@@ -89,21 +154,22 @@ async def get_recommendations(
         top_k = TOP_K
     
     try:
-        recommendations = _generate_recommendations(user_id, top_k)
+        # Scoring is CPU-bound; keep it off the event loop
+        recommendations = await asyncio.to_thread(_generate_recommendations, user_id, top_k)
         
         if not recommendations:
             raise HTTPException(status_code=404, detail=f"No recommendations for user {user_id}")
         
-        scores = [r['relevance_score'] for r in recommendations]
+        scores = [score for _, score, _ in recommendations]
         avg_score = float(np.mean(scores))
         
         items = [
             RecommendedItem(
-                item_id=int(r['item_id']),
-                relevance_score=float(r['relevance_score']),
-                rank=int(r['rank'])
+                item_id=int(item_id),
+                relevance_score=float(score),
+                rank=int(rank)
             )
-            for r in recommendations
+            for item_id, score, rank in recommendations
         ]
         
         return RecommendationResponse(
@@ -113,25 +179,91 @@ async def get_recommendations(
             average_relevance_score=avg_score
         )
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
 
-def _generate_recommendations(user_id: int, top_k: int) -> List[Dict]:
-    """Generate recommendations for a user."""
-    recommendations = []
+@lru_cache(maxsize=NUM_USERS)
+def _user_context(user_id: int) -> Optional[Tuple[np.ndarray, Dict[str, float]]]:
+    """Return (mastery_vector, user_stats) for a user, or None if unknown.
     
-    for rank in range(1, top_k + 1):
-        item_id = (user_id * 7 + rank) % 30
-        score = max(0.8 - (rank - 1) * 0.1, 0.5)
-        recommendations.append({
-            'item_id': item_id,
-            'relevance_score': score,
-            'rank': rank
-        })
+    The context is computed once and reused across all candidate items and
+    requests; the cache is cleared whenever models are (re)loaded.
+    """
+    users = app.state.users
+    row = users.id_to_idx.get(user_id)
+    if row is None:
+        return None
     
-    recommendations.sort(key=lambda x: (-x['relevance_score'], x['rank']))
-    return recommendations
+    # Users without interactions get the same 0.0 defaults used in training
+    history = app.state.user_stats.get(user_id, {})
+    user_stats = {
+        'dropout_sensitivity': float(users.dropout_sensitivity[row]),
+        'learning_rate': float(users.learning_rate[row]),
+        'success_rate': float(history.get('success_rate', 0.0)),
+        'avg_quiz': float(history.get('avg_quiz', 0.0)),
+        'avg_time': float(history.get('avg_time', 0.0)),
+        'num_attempts': float(history.get('num_attempts', 0)),
+    }
+    return users.mastery[row], user_stats
+
+
+@lru_cache(maxsize=RECOMMENDATION_CACHE_SIZE)
+def _generate_recommendations(user_id: int, top_k: int) -> Tuple[Tuple[int, float, int], ...]:
+    """Generate recommendations for a user.
+    
+    Synchronous and CPU-bound: call it through asyncio.to_thread from handlers.
+    Results are cached per (user_id, top_k) as immutable
+    (item_id, relevance_score, rank) tuples.
+    """
+    context = _user_context(user_id)
+    if context is None:
+        return ()
+    
+    # Score every catalog item against the user's context in one predict() call
+    mastery, user_stats = context
+    buffer = app.state.feature_buffers.get()  # blocks only if every buffer is in use
+    try:
+        X = candidate_feature_matrix(
+            mastery, user_stats, app.state.soa, app.state.item_stats, app.state.feature_columns,
+            out=buffer
+        )
+        if app.state.scaler is not None:
+            X = app.state.scaler.transform(_as_fitted_input(app.state.scaler, X))
+        scores = app.state.ranking_model.predict(_as_fitted_input(app.state.ranking_model, X))
+    finally:
+        app.state.feature_buffers.put(buffer)
+    
+    # Top-K above the threshold: O(N) argpartition, then order only the K survivors
+    item_ids = app.state.soa.item_ids
+    candidates = np.flatnonzero(scores >= MIN_RELEVANCE_THRESHOLD)
+    k = min(top_k, len(candidates))
+    if k <= 0:
+        return ()
+    if k < len(candidates):
+        candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+    # Highest score first, ties broken by item_id
+    top = candidates[np.lexsort((item_ids[candidates], -scores[candidates]))]
+    
+    return tuple(
+        (int(item_ids[i]), float(scores[i]), rank)
+        for rank, i in enumerate(top, 1)
+    )
+
+
+def _as_fitted_input(estimator, X: np.ndarray):
+    """Wrap X in a DataFrame only if the estimator was fitted with feature names."""
+    if getattr(estimator, 'feature_names_in_', None) is None:
+        return X
+    return pd.DataFrame(X, columns=app.state.feature_columns, copy=False)
+
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Recommendation cache hit/miss counters."""
+    return _generate_recommendations.cache_info()._asdict()
 
 
 @app.get("/")
@@ -0,0 +1,125 @@
+"""
+User and item catalogs as structure-of-arrays tables.
+
+Shared by the simulator, which generates them, and the feature code, which
+consumes them; kept outside both packages (like jit.py) so neither has to
+import the other.
+"""
+
+import numpy as np
+from typing import Dict, NamedTuple
+
+
+def inverse_counts(counts: np.ndarray) -> np.ndarray:
+    """
+    1 / counts as float32, with 0.0 where the count is 0.
+
+    Lets means over an item's skills be taken with a multiply instead of a
+    guarded divide.
+    """
+    inverse = np.zeros(len(counts), dtype=np.float32)
+    nonzero = counts > 0
+    inverse[nonzero] = 1.0 / counts[nonzero]
+    return inverse
+
+
+class UsersTable(NamedTuple):
+    """
+    User catalog as parallel arrays, row `r` belonging to `user_ids[r]`.
+    """
+    user_ids: np.ndarray              # (U,) int64
+    mastery: np.ndarray               # (U, K) float32
+    learning_rate: np.ndarray         # (U,) float64
+    difficulty_tolerance: np.ndarray  # (U,) float64
+    dropout_sensitivity: np.ndarray   # (U,) float64
+    id_to_idx: Dict[int, int]
+
+    @classmethod
+    def from_dicts(cls, users: Dict[int, Dict]) -> "UsersTable":
+        """
+        Build the arrays once from user_id -> user dicts (rows sorted by id).
+
+        Mastery is copied, so later updates to the table do not touch the dicts.
+        """
+        user_ids = np.array(sorted(users), dtype=np.int64)
+        rows = [users[u] for u in user_ids]
+        return cls(
+            user_ids=user_ids,
+            mastery=np.stack([user["mastery"] for user in rows]).astype(np.float32),
+            learning_rate=np.array([user["learning_rate"] for user in rows], dtype=np.float64),
+            difficulty_tolerance=np.array([user["difficulty_tolerance"] for user in rows], dtype=np.float64),
+            dropout_sensitivity=np.array([user["dropout_sensitivity"] for user in rows], dtype=np.float64),
+            id_to_idx={int(u): r for r, u in enumerate(user_ids)},
+        )
+
+    def as_dict(self, row: int) -> Dict:
+        """User dict (the legacy catalog format) for one row; mastery is copied."""
+        return {
+            "user_id": int(self.user_ids[row]),
+            "mastery": self.mastery[row].copy(),
+            "learning_rate": float(self.learning_rate[row]),
+            "difficulty_tolerance": float(self.difficulty_tolerance[row]),
+            "dropout_sensitivity": float(self.dropout_sensitivity[row]),
+        }
+
+    def to_dicts(self) -> Dict[int, Dict]:
+        """Legacy user_id -> user dict catalog."""
+        return {int(user_id): self.as_dict(row) for row, user_id in enumerate(self.user_ids)}
+
+
+class ItemsTable(NamedTuple):
+    """
+    Item catalog as parallel arrays, row `r` belonging to `item_ids[r]`.
+    """
+    item_ids: np.ndarray           # (I,) int64
+    skills: np.ndarray             # (I, K) uint8 binary coverage
+    skill_count: np.ndarray        # (I,) int32
+    inv_skill_count: np.ndarray    # (I,) float32, 1 / skill_count (0.0 for no skills)
+    difficulty: np.ndarray         # (I,) int8, 1 to 5
+    num_prerequisites: np.ndarray  # (I,) int32
+    estimated_time: np.ndarray     # (I,) float64
+    prerequisites: np.ndarray      # (I, K) bool, True for prerequisite skills
+    id_to_idx: Dict[int, int]
+
+    @classmethod
+    def from_dicts(cls, items: Dict[int, Dict]) -> "ItemsTable":
+        """
+        Build the arrays once from item_id -> item dicts (rows sorted by id).
+        """
+        item_ids = np.array(sorted(items), dtype=np.int64)
+        rows = [items[i] for i in item_ids]
+        skills = np.stack([item["skills"] for item in rows]).astype(np.uint8)
+        skill_count = np.count_nonzero(skills, axis=1).astype(np.int32)
+        prerequisites = np.zeros(skills.shape, dtype=np.bool_)
+        for row, item in enumerate(rows):
+            prerequisites[row, item["prerequisites"]] = True
+        return cls(
+            item_ids=item_ids,
+            skills=skills,
+            skill_count=skill_count,
+            inv_skill_count=inverse_counts(skill_count),
+            difficulty=np.array([item["difficulty"] for item in rows], dtype=np.int8),
+            num_prerequisites=np.array([len(item["prerequisites"]) for item in rows], dtype=np.int32),
+            estimated_time=np.array([item["estimated_time"] for item in rows], dtype=np.float64),
+            prerequisites=prerequisites,
+            id_to_idx={int(i): r for r, i in enumerate(item_ids)},
+        )
+
+    def as_dict(self, row: int) -> Dict:
+        """
+        Item dict (the legacy catalog format) for one row.
+
+        The normalized skill vector and skill count are added on first use by
+        simulator.items.skills_normalized.
+        """
+        return {
+            "item_id": int(self.item_ids[row]),
+            "skills": self.skills[row].astype(np.float32),
+            "difficulty": int(self.difficulty[row]),
+            "prerequisites": np.flatnonzero(self.prerequisites[row]).tolist(),
+            "estimated_time": float(self.estimated_time[row]),
+        }
+
+    def to_dicts(self) -> Dict[int, Dict]:
+        """Legacy item_id -> item dict catalog."""
+        return {int(item_id): self.as_dict(row) for row, item_id in enumerate(self.item_ids)}
@@ -11,6 +11,17 @@ RAW_DATA_DIR = os.path.join(DATA_DIR, "raw")
 PROCESSED_DATA_DIR = os.path.join(DATA_DIR, "processed")
 MODELS_DIR = os.path.join(PROJECT_ROOT, "models")
 
+# Opt-in: MODEL_MMAP_MODE=r memory-maps model arrays on load. Only uncompressed
+# files (large models) can be mapped, and only arrays kept as loaded are shared
+# by API workers through the OS page cache: hist_gbm's tree nodes are, while
+# sklearn copies RandomForest tree arrays into private memory when unpickling.
+# Unset loads everything into memory.
+MODEL_MMAP_MODE = os.environ.get("MODEL_MMAP_MODE") or None
+
+# Objects whose pickle is above this size are saved uncompressed (fast to load,
+# can be memory-mapped); smaller ones are compressed
+LARGE_MODEL_BYTES = 10 * 1024 * 1024
+
 # Create directories if they don't exist
 for dir_path in [DATA_DIR, RAW_DATA_DIR, PROCESSED_DATA_DIR, MODELS_DIR]:
     os.makedirs(dir_path, exist_ok=True)
@@ -40,7 +51,10 @@ FEATURE_COLUMNS = [
 ]
 
 # Ranking model parameters
-RANKING_MODEL_TYPE = 'random_forest'  # 'random_forest' or 'ridge'
+# Passed to the model constructor as-is for random_forest and ridge (ridge takes
+# e.g. {'alpha': 1.0}). For hist_gbm, n_estimators is used as max_iter and
+# options HistGradientBoostingRegressor lacks (e.g. min_samples_split) are dropped.
+RANKING_MODEL_TYPE = 'random_forest'  # 'random_forest', 'ridge' or 'hist_gbm'
 RANKING_MODEL_PARAMS = {
     'n_estimators': 100,
     'random_state': RANDOM_SEED,
@@ -50,6 +64,7 @@ RANKING_MODEL_PARAMS = {
 # Recommendation parameters
 TOP_K = 5  # Number of recommendations to return per user
 MIN_RELEVANCE_THRESHOLD = 0.2  # Minimum relevance score to recommend
+RECOMMENDATION_CACHE_SIZE = 10_000  # Max cached (user_id, top_k) API responses
 
 # Relevance formula weights
 RELEVANCE_WEIGHTS = {
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+
+from .soa import CatalogArrays, expected_skill_gain, user_item_skill_features
+
+
+def align_item_stats(item_features: pd.DataFrame, soa: CatalogArrays) -> Dict[str, np.ndarray]:
+    """
+    Align extract_item_features output to the row order of `soa.item_ids`.
+
+    Items without interactions get the same 0.0 defaults used during training.
+    """
+    stats = item_features.set_index("item_id").reindex(soa.item_ids)
+    return {
+        col: stats[col].fillna(0.0).to_numpy(dtype=np.float64)
+        for col in ("avg_success", "avg_quiz", "avg_time")
+    }
+
+
+def _candidate_columns(
+    mastery: np.ndarray,
+    user_stats: Dict[str, float],
+    soa: CatalogArrays,
+    item_stats: Dict[str, np.ndarray],
+) -> Dict[str, np.ndarray]:
+    """
+    Features for one user's next interaction with every item in the catalog.
+
+    Mirrors extract_interaction_features, but the user-side context is fixed
+    and broadcast across items, so the whole catalog is scored in one pass.
+
+    Args:
+        mastery: The user's current mastery vector (num_skills,)
+        user_stats: dropout_sensitivity, learning_rate and the user's historical
+            success_rate, avg_quiz, avg_time and num_attempts
+        soa: Catalog arrays from build_soa
+        item_stats: align_item_stats output
+
+    Returns:
+        Dict of feature name -> (num_items,) array in `soa.item_ids` order;
+        user-level features are scalars that broadcast across items
+    """
+    # -----------------------------
+    # Skill-level features
+    # -----------------------------
+    skill_gap, fraction_skills_mastered = user_item_skill_features(mastery, soa)
+    # Mean mastery over the item's skills is the complement of the gap
+    skill_match = np.where(soa.num_skills > 0, 1.0 - skill_gap, 0.0)
+
+    # Expected gain if the user succeeds, as in training
+    skill_gain = expected_skill_gain(user_stats["learning_rate"], skill_gap)
+
+    return {
+        "skill_match": skill_match,
+        "difficulty": soa.difficulty,
+        "dropout_sensitivity": user_stats["dropout_sensitivity"],
+        "num_prerequisites": soa.num_prerequisites,
+        "estimated_time": soa.estimated_time,
+        "skill_gain": skill_gain,
+        "step": user_stats["num_attempts"],
+        "skill_gap": skill_gap,
+        "fraction_skills_mastered": fraction_skills_mastered,
+        "difficulty_gap": soa.difficulty - mastery.mean() * 5,
+        "user_success_rate": user_stats["success_rate"],
+        "user_avg_quiz": user_stats["avg_quiz"],
+        "user_avg_time": user_stats["avg_time"],
+        "user_num_attempts": user_stats["num_attempts"],
+        "item_avg_success": item_stats["avg_success"],
+        "item_avg_quiz": item_stats["avg_quiz"],
+        "item_avg_time": item_stats["avg_time"],
+        "item_num_skills": soa.num_skills,
+    }
+
+
+def candidate_feature_matrix(
+    mastery: np.ndarray,
+    user_stats: Dict[str, float],
+    soa: CatalogArrays,
+    item_stats: Dict[str, np.ndarray],
+    feature_columns: List[str],
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Candidate features as a (num_items, len(feature_columns)) float32 matrix.
+
+    Columns follow `feature_columns`, ready to pass straight to a model's
+    predict(). If `out` is given it is filled in place and returned.
+    """
+    columns = _candidate_columns(mastery, user_stats, soa, item_stats)
+    if out is None:
+        out = np.empty((len(soa.item_ids), len(feature_columns)), dtype=np.float32)
+
+    for j, name in enumerate(feature_columns):
+        out[:, j] = columns[name]
+    return out
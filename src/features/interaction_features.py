@@ -1,89 +1,159 @@
 import pandas as pd
 import numpy as np
-from typing import Dict
+from typing import Dict, Optional
+
+from .soa import CatalogArrays, build_soa, expected_skill_gain, user_item_skill_features
+from ..jit import NUMBA_AVAILABLE, njit, prange
+
+HISTORY_COLUMNS = ("success", "quiz_score", "time_spent")
+
+
+def _prior_stats(logs: pd.DataFrame, key: str):
+    """
+    Leakage-free running averages of HISTORY_COLUMNS grouped by `key`.
+
+    For every row only strictly earlier rows of the same group are used, so the
+    current interaction never contributes to its own features.
+
+    Returns:
+        (Dict[column, np.ndarray] of prior means, np.ndarray of prior counts)
+    """
+    columns = list(HISTORY_COLUMNS)
+    grouped = logs.groupby(key, sort=False)
+    prior_count = grouped.cumcount().to_numpy()
+
+    # One grouped pass accumulates every column; subtracting the current row
+    # leaves the exclusive running totals
+    prior_sums = (
+        grouped[columns].cumsum().to_numpy(dtype=np.float64)
+        - logs[columns].to_numpy(dtype=np.float64)
+    )
+    prior_means = prior_sums / np.maximum(prior_count, 1)[:, None]  # 0.0 when there is no history
+
+    return dict(zip(columns, prior_means.T)), prior_count
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _row_skill_features(mastery, mean_mastery, skills, num_skills, difficulty, user_idx, item_idx):
+    """
+    Per-interaction skill_gap, fraction_skills_mastered and difficulty_gap.
+
+    Streams over the rows instead of materializing (users x items) matrices;
+    the inner loop over skills is compiled and SIMD-vectorized by Numba.
+    """
+    n = user_idx.shape[0]
+    skill_gap = np.empty(n, dtype=np.float32)
+    fraction_mastered = np.empty(n, dtype=np.float32)
+    difficulty_gap = np.empty(n, dtype=np.float32)
+
+    for r in prange(n):
+        u = user_idx[r]
+        i = item_idx[r]
+        gap = 0.0
+        mastered = 0.0
+        for k in range(skills.shape[1]):
+            if skills[i, k]:
+                gap += 1.0 - mastery[u, k]
+                if mastery[u, k] >= 0.8:
+                    mastered += 1.0
+        denom = max(num_skills[i], 1)
+        skill_gap[r] = gap / denom
+        fraction_mastered[r] = mastered / denom
+        difficulty_gap[r] = difficulty[i] - mean_mastery[u] * 5
+
+    return skill_gap, fraction_mastered, difficulty_gap
+
 
 def extract_interaction_features(
     logs: pd.DataFrame,
     users: Dict[int, Dict],
     items: Dict[int, Dict],
+    soa: Optional[CatalogArrays] = None,
 ) -> pd.DataFrame:
     """
     Generate features for each user-item interaction in the logs.
 
+    Args:
+        logs: DataFrame returned by the simulator
+        users: Dictionary of user_id -> user dicts
+        items: Dictionary of item_id -> item dicts
+        soa: Precomputed build_soa(users, items); built here if omitted
+
     Returns:
         DataFrame with one row per interaction, augmented with computed features
     """
-    # Start with a copy of the logs
-    features_df = logs.copy()
-
-    # Add computed features
-    features_list = []
-    for idx, row in logs.iterrows():
-        user_id         = row["user_id"]
-        item_id         = row["item_id"]
-        
-        user            = users[user_id]
-        item            = items[item_id]
-        
-        user_mastery    = user["mastery"]
-        item_skills     = item["skills"]
-        item_difficulty = item["difficulty"]
-
-        # -----------------------------
-        # Skill-level features
-        # -----------------------------
-        relevant_skills = item_skills.astype(bool)
-        if relevant_skills.any():
-            skill_gap = np.mean(1.0 - user_mastery[relevant_skills])
-            fraction_skills_mastered = np.mean(user_mastery[relevant_skills] >= 0.8)
-        else:
-            skill_gap = 0.0
-            fraction_skills_mastered = 0.0
+    # Historical features look at rows with a smaller index, so work in index order
+    if logs.index.is_monotonic_increasing:
+        order = None
+        ordered = logs
+    else:
+        order = np.argsort(logs.index.to_numpy(), kind="stable")
+        ordered = logs.iloc[order]
+
+    # -----------------------------
+    # Skill-level features
+    # -----------------------------
+    if soa is None:
+        soa = build_soa(users, items)
+
+    user_idx = soa.user_index(ordered["user_id"].to_numpy())
+    item_idx = soa.item_index(ordered["item_id"].to_numpy())
+
+    mastery_matrix = soa.mastery
+    mean_mastery = mastery_matrix.mean(axis=1)
+
+    if NUMBA_AVAILABLE and len(soa.user_ids) * len(soa.item_ids) > len(ordered):
+        # More (user, item) pairs than interactions: stream over the logs instead
+        skill_gap, fraction_skills_mastered, difficulty_gap = _row_skill_features(
+            mastery_matrix, mean_mastery, soa.skills, soa.num_skills, soa.difficulty,
+            user_idx, item_idx,
+        )
+    else:
+        # Score every (user, item) pair with one matmul, then gather per interaction
+        skill_gap_pairs, mastered_pairs = user_item_skill_features(mastery_matrix, soa)
 
         # Difficulty gap: item difficulty vs user's average mastery
-        avg_user_mastery = np.mean(user_mastery)
-        difficulty_gap = item_difficulty - avg_user_mastery * 5  # scale mastery to 0-5
-
-        # -----------------------------
-        # User historical features (up to but not including this interaction)
-        # -----------------------------
-        # Note: For simplicity, using all user logs; in practice, you might want to filter by timestamp
-        user_logs = logs[(logs["user_id"] == user_id) & (logs.index < idx)]  # Exclude current interaction
-
-        success_rate = user_logs["success"].mean() if not user_logs.empty else 0.0
-        avg_quiz = user_logs["quiz_score"].mean() if not user_logs.empty else 0.0
-        avg_time = user_logs["time_spent"].mean() if not user_logs.empty else 0.0
-        num_attempts = len(user_logs)
-
-        # -----------------------------
-        # Item historical features
-        # -----------------------------
-        item_logs = logs[(logs["item_id"] == item_id) & (logs.index < idx)]  # Exclude current interaction
-        item_avg_success = item_logs["success"].mean() if not item_logs.empty else 0.0
-        item_avg_quiz = item_logs["quiz_score"].mean() if not item_logs.empty else 0.0
-        item_avg_time = item_logs["time_spent"].mean() if not item_logs.empty else 0.0
-
-        # -----------------------------
-        # Combine features
-        # -----------------------------
-        features = {
-            "skill_gap": skill_gap,
-            "fraction_skills_mastered": fraction_skills_mastered,
-            "difficulty_gap": difficulty_gap,  # Overwrites the one from logs (different calculation)
-            "user_success_rate": success_rate,
-            "user_avg_quiz": avg_quiz,
-            "user_avg_time": avg_time,
-            "user_num_attempts": num_attempts,
-            "item_avg_success": item_avg_success,
-            "item_avg_quiz": item_avg_quiz,
-            "item_avg_time": item_avg_time,
-            "item_num_skills": int(np.sum(item_skills))
-            # Note: Skipping item_num_prerequisites and item_difficulty as they duplicate logs columns
-        }
-        features_list.append(features)
-
-    # Add features to the DataFrame
-    features_df = logs.copy()
-    features_df = pd.concat([features_df.drop(columns=list(set(logs.columns) & set(pd.DataFrame(features_list).columns))), pd.DataFrame(features_list)], axis=1)
-    
+        difficulty_gap_pairs = soa.difficulty[None, :] - mean_mastery[:, None] * 5  # scale mastery to 0-5
+
+        skill_gap = skill_gap_pairs[user_idx, item_idx]
+        fraction_skills_mastered = mastered_pairs[user_idx, item_idx]
+        difficulty_gap = difficulty_gap_pairs[user_idx, item_idx]
+
+    # -----------------------------
+    # User / item historical features (up to but not including this interaction)
+    # -----------------------------
+    user_history, user_num_attempts = _prior_stats(ordered, "user_id")
+    item_history, _ = _prior_stats(ordered, "item_id")
+
+    # -----------------------------
+    # Combine features
+    # -----------------------------
+    computed = {
+        "skill_gap": skill_gap.astype(np.float32),
+        "fraction_skills_mastered": fraction_skills_mastered.astype(np.float32),
+        "difficulty_gap": difficulty_gap.astype(np.float32),  # Overwrites the one from logs (different calculation)
+        # Overwrites the realized gain from logs, which is 0 whenever the interaction failed
+        "skill_gain": expected_skill_gain(soa.learning_rate[user_idx], skill_gap).astype(np.float32),
+        "user_success_rate": user_history["success"].astype(np.float32),
+        "user_avg_quiz": user_history["quiz_score"].astype(np.float32),
+        "user_avg_time": user_history["time_spent"].astype(np.float32),
+        "user_num_attempts": user_num_attempts.astype(np.int32),
+        "item_avg_success": item_history["success"].astype(np.float32),
+        "item_avg_quiz": item_history["quiz_score"].astype(np.float32),
+        "item_avg_time": item_history["time_spent"].astype(np.float32),
+        "item_num_skills": soa.num_skills[item_idx],  # int32
+        # Note: Skipping item_num_prerequisites and item_difficulty as they duplicate logs columns
+    }
+
+    if order is not None:
+        # Back from index order to the caller's row order
+        restore = np.empty_like(order)
+        restore[order] = np.arange(len(order))
+        computed = {name: values[restore] for name, values in computed.items()}
+
+    # Add features to the logs: one copy for the drop, then in-place column inserts
+    features_df = logs.drop(columns=[col for col in logs.columns if col in computed])
+    for name, values in computed.items():
+        features_df[name] = values
+
     return features_df
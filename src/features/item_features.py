@@ -1,52 +1,42 @@
 import pandas as pd
 import numpy as np
-from typing import Dict
+from typing import Dict, Union
 
-def extract_item_features(logs: pd.DataFrame, items: Dict[int, Dict]) -> pd.DataFrame:
+from ..catalog import ItemsTable
+
+
+def extract_item_features(logs: pd.DataFrame, items: Union[Dict[int, Dict], ItemsTable]) -> pd.DataFrame:
     """
     Extract per-item features from interaction logs and item definitions.
 
     Args:
         logs: DataFrame returned by the simulator
-        items: Dictionary of item_id -> item dicts
+        items: ItemsTable, or dictionary of item_id -> item dicts
 
     Returns:
         DataFrame with one row per item
     """
-    item_features = []
-
-    for item_id, item in items.items():
-        # Static features
-        num_skills = int(np.sum(item["skills"]))
-        num_prerequisites = len(item["prerequisites"])
-        difficulty = float(item["difficulty"])
-
-        # Logs for this item
-        item_logs = logs[logs["item_id"] == item_id]
-
-        if not item_logs.empty:
-            avg_success = item_logs["success"].mean()
-            avg_quiz = item_logs["quiz_score"].mean()
-            avg_time = item_logs["time_spent"].mean()
-            num_attempts = len(item_logs)
-        else:
-            # If no interactions yet, default values
-            avg_success = 0.0
-            avg_quiz = 0.0
-            avg_time = 0.0
-            num_attempts = 0
-
-        features = {
-            "item_id": item_id,
-            "difficulty": difficulty,
-            "num_skills": num_skills,
-            "num_prerequisites": num_prerequisites,
-            "avg_success": avg_success,
-            "avg_quiz": avg_quiz,
-            "avg_time": avg_time,
-            "num_attempts": num_attempts
-        }
-
-        item_features.append(features)
-
-    return pd.DataFrame(item_features)
+    if not isinstance(items, ItemsTable):
+        items = ItemsTable.from_dicts(items)
+
+    # Aggregate all item logs in one pass, aligned to the catalog rows
+    item_stats = logs.groupby("item_id").agg(
+        avg_success=("success", "mean"),
+        avg_quiz=("quiz_score", "mean"),
+        avg_time=("time_spent", "mean"),
+        num_attempts=("success", "size"),
+    ).reindex(items.item_ids)
+
+    # If no interactions yet, default values
+    item_stats = item_stats.fillna(0)
+
+    return pd.DataFrame({
+        "item_id": items.item_ids,
+        "difficulty": items.difficulty.astype(np.float32),
+        "num_skills": items.skill_count.astype(np.int32),
+        "num_prerequisites": items.num_prerequisites.astype(np.int32),
+        "avg_success": item_stats["avg_success"].to_numpy(dtype=np.float32),
+        "avg_quiz": item_stats["avg_quiz"].to_numpy(dtype=np.float32),
+        "avg_time": item_stats["avg_time"].to_numpy(dtype=np.float32),
+        "num_attempts": item_stats["num_attempts"].to_numpy(dtype=np.int32),
+    })
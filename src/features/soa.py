@@ -0,0 +1,122 @@
+import numpy as np
+from typing import Dict, NamedTuple, Union
+
+from ..catalog import ItemsTable, UsersTable
+
+
+class CatalogArrays(NamedTuple):
+    """
+    Structure-of-arrays view of the user and item catalogs.
+
+    Row `r` of every user array belongs to `user_ids[r]`, row `r` of every item
+    array to `item_ids[r]`. Ids are sorted so they can be mapped with
+    `np.searchsorted`.
+    """
+    user_ids: np.ndarray           # (U,) int64
+    item_ids: np.ndarray           # (I,) int64
+    mastery: np.ndarray            # (U, K) float32
+    learning_rate: np.ndarray      # (U,) float64
+    skills: np.ndarray             # (I, K) uint8
+    skills_matrix: np.ndarray      # (I, K) float32 copy of `skills` for matmuls
+    num_skills: np.ndarray         # (I,) int32
+    difficulty: np.ndarray         # (I,) float32
+    num_prerequisites: np.ndarray  # (I,) int32
+    estimated_time: np.ndarray     # (I,) float32
+
+    def user_index(self, user_ids) -> np.ndarray:
+        """Map user ids to row indices; KeyError for ids not in the catalog."""
+        return _id_rows(self.user_ids, user_ids, "user")
+
+    def item_index(self, item_ids) -> np.ndarray:
+        """Map item ids to row indices; KeyError for ids not in the catalog."""
+        return _id_rows(self.item_ids, item_ids, "item")
+
+
+def _id_rows(ids: np.ndarray, query, kind: str) -> np.ndarray:
+    """
+    Rows of the sorted `ids` holding each id in `query`.
+
+    searchsorted alone returns an insertion point for an unknown id, which the
+    feature kernels would read as another user's or item's row (or out of
+    bounds), so every match is checked.
+    """
+    query = np.asarray(query)
+    rows = np.searchsorted(ids, query)
+    if len(ids):
+        missing = ids[np.minimum(rows, len(ids) - 1)] != query
+    else:
+        missing = np.ones(query.shape, dtype=np.bool_)
+    if np.any(missing):
+        unknown = np.unique(query[missing])
+        raise KeyError(f"Unknown {kind} ids: {unknown[:5].tolist()}")
+    return rows
+
+
+def build_soa(
+    users: Union[Dict[int, Dict], UsersTable],
+    items: Union[Dict[int, Dict], ItemsTable],
+) -> CatalogArrays:
+    """
+    Convert the user/item catalogs into the contiguous arrays used for features.
+
+    Args:
+        users: UsersTable, or dictionary of user_id -> user dicts
+        items: ItemsTable, or dictionary of item_id -> item dicts
+
+    Returns:
+        CatalogArrays with one row per user / item
+    """
+    if not isinstance(users, UsersTable):
+        users = UsersTable.from_dicts(users)
+    if not isinstance(items, ItemsTable):
+        items = ItemsTable.from_dicts(items)
+
+    # Tables built elsewhere may not be in id order; CatalogArrays must be
+    user_order = np.argsort(users.user_ids, kind="stable")
+    item_order = np.argsort(items.item_ids, kind="stable")
+
+    skills = items.skills[item_order]
+
+    return CatalogArrays(
+        user_ids=users.user_ids[user_order],
+        item_ids=items.item_ids[item_order],
+        mastery=users.mastery[user_order].astype(np.float32),
+        learning_rate=users.learning_rate[user_order],
+        skills=skills,
+        skills_matrix=skills.astype(np.float32),
+        num_skills=items.skill_count[item_order].astype(np.int32),
+        difficulty=items.difficulty[item_order].astype(np.float32),
+        num_prerequisites=items.num_prerequisites[item_order].astype(np.int32),
+        estimated_time=items.estimated_time[item_order].astype(np.float32),
+    )
+
+
+def user_item_skill_features(mastery: np.ndarray, soa: CatalogArrays):
+    """
+    skill_gap and fraction_skills_mastered of one or many users against every item.
+
+    Both are means over each item's skills (0.0 for items without skills),
+    computed as one matmul against the catalog's skills matrix.
+
+    Args:
+        mastery: (K,) mastery vector or (U, K) mastery matrix
+
+    Returns:
+        (skill_gap, fraction_skills_mastered), each (I,) or (U, I)
+    """
+    skill_denom = np.maximum(soa.num_skills, 1)
+    skill_gap = ((1.0 - mastery) @ soa.skills_matrix.T) / skill_denom
+    fraction_mastered = ((mastery >= 0.8).astype(np.float32) @ soa.skills_matrix.T) / skill_denom
+    return skill_gap, fraction_mastered
+
+
+def expected_skill_gain(learning_rate, skill_gap):
+    """
+    The skill_gain feature: mean mastery gain over an item's skills on success.
+
+    A success moves each skill by learning_rate * (1 - mastery), so this is
+    learning_rate * skill_gap. Training and candidate scoring both build the
+    feature this way; the simulator's logged skill_gain is the realized gain
+    (0 on failure), an outcome like success.
+    """
+    return learning_rate * skill_gap
@@ -0,0 +1,25 @@
+"""
+Optional Numba support for numeric kernels (requirements-optional.txt).
+
+Kernels import `njit` / `prange` from here. When Numba is not installed the
+decorator is a no-op and `prange` is `range`, so the kernels still run (as
+plain Python) and callers can check NUMBA_AVAILABLE to prefer a NumPy path.
+
+Inside kernels, small dot products over the skill vector are written as
+explicit loops rather than np.dot: Numba sends np.dot to BLAS on every call,
+and for K-element vectors the call overhead dominates, while a plain loop is
+inlined and auto-vectorized by LLVM.
+"""
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit that returns the function unchanged."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
@@ -2,24 +2,59 @@
 
 import joblib
 import os
+import pickle
 from pathlib import Path
 from typing import Any, Dict
 
+from ..features.item_features import extract_item_features
+from ..features.user_features import extract_user_features
+
+try:
+    import lz4.frame  # noqa: F401
+    SMALL_MODEL_COMPRESS = ('lz4', 3)
+except ImportError:
+    SMALL_MODEL_COMPRESS = ('zlib', 3)
+
+# Uncompressed joblib files are plain pickles, which start with the PROTO opcode
+_PICKLE_PROTO = b'\x80'
+
+
+def _pickled_size(obj: Any) -> int:
+    """
+    Size of obj's protocol 5 pickle, about that of an uncompressed joblib file.
+
+    Array data goes to buffer_callback as out-of-band buffers, which are only
+    counted, so the estimate pickles just the object's structure.
+    """
+    buffer_bytes = 0
+
+    def count(buffer: pickle.PickleBuffer):
+        nonlocal buffer_bytes
+        buffer_bytes += buffer.raw().nbytes
+
+    return len(pickle.dumps(obj, protocol=5, buffer_callback=count)) + buffer_bytes
+
 
 class ModelPersistence:
     """Handle saving and loading models with joblib."""
     
-    def __init__(self, model_dir: str = None):
+    def __init__(self, model_dir: str = None, mmap_mode: str = None):
         """Initialize persistence utility.
         
         Args:
             model_dir: Directory to store models (default: PROJECT_ROOT/models)
+            mmap_mode: joblib mmap_mode used when loading (default: MODEL_MMAP_MODE)
         """
         if model_dir is None:
             from ..config import MODELS_DIR
             model_dir = MODELS_DIR
         
+        if mmap_mode is None:
+            from ..config import MODEL_MMAP_MODE
+            mmap_mode = MODEL_MMAP_MODE
+        
         self.model_dir = model_dir
+        self.mmap_mode = mmap_mode
         Path(self.model_dir).mkdir(parents=True, exist_ok=True)
     
     def save_model(self, model: Any, model_name: str) -> str:
@@ -32,8 +67,24 @@ class ModelPersistence:
         Returns:
             Path to saved model
         """
+        from ..config import LARGE_MODEL_BYTES
         filepath = os.path.join(self.model_dir, f"{model_name}.pkl")
-        joblib.dump(model, filepath, compress=3)
+        
+        # Write next to the target and swap it in with os.replace, so a worker
+        # that has the old file memory-mapped keeps reading the old contents
+        tmp_path = f"{filepath}.{os.getpid()}.tmp"
+        try:
+            # Compression dominates save/load time for large models, and
+            # compressed files cannot be memory-mapped on load; the plain
+            # pickle's size decides which ones are large
+            if _pickled_size(model) > LARGE_MODEL_BYTES:
+                joblib.dump(model, tmp_path, compress=0, protocol=5)
+            else:
+                joblib.dump(model, tmp_path, compress=SMALL_MODEL_COMPRESS)
+            os.replace(tmp_path, filepath)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
         return filepath
     
     def load_model(self, model_name: str) -> Any:
@@ -48,7 +99,11 @@ class ModelPersistence:
         filepath = os.path.join(self.model_dir, f"{model_name}.pkl")
         if not os.path.exists(filepath):
             raise FileNotFoundError(f"Model not found: {filepath}")
-        return joblib.load(filepath)
+        
+        # Only uncompressed files can be memory-mapped
+        with open(filepath, 'rb') as f:
+            mappable = f.read(1) == _PICKLE_PROTO
+        return joblib.load(filepath, mmap_mode=self.mmap_mode if mappable else None)
     
     def model_exists(self, model_name: str) -> bool:
         """Check if a model exists."""
@@ -95,6 +150,19 @@ def save_pipeline_models(pipeline, persistence: ModelPersistence = None):
             'feature_columns'
         )
     
+    # Serving context: catalog plus per-user / per-item interaction history
+    if pipeline.users is not None and pipeline.items is not None and pipeline.logs is not None:
+        saved['users'] = persistence.save_model(pipeline.users, 'users')
+        saved['items'] = persistence.save_model(pipeline.items, 'items')
+        saved['user_features'] = persistence.save_model(
+            extract_user_features(pipeline.logs),
+            'user_features'
+        )
+        saved['item_features'] = persistence.save_model(
+            extract_item_features(pipeline.logs, pipeline.items),
+            'item_features'
+        )
+    
     return saved
 
 
@@ -121,4 +189,8 @@ def load_pipeline_models(persistence: ModelPersistence = None) -> Dict:
     if persistence.model_exists('feature_columns'):
         models['feature_columns'] = persistence.load_model('feature_columns')
     
+    for name in ('users', 'items', 'user_features', 'item_features'):
+        if persistence.model_exists(name):
+            models[name] = persistence.load_model(name)
+    
     return models
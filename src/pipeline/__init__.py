@@ -4,8 +4,9 @@ Pipeline: Complete end-to-end learning path recommendation pipeline
 
 import pandas as pd
 import numpy as np
-from typing import Dict, Tuple, Optional
+from typing import Dict, Tuple, Optional, Union
 
+from ..catalog import ItemsTable, UsersTable
 from .data_pipeline import DataPipeline
 from .ranking_pipeline import RankingPipeline
 from .recommender import RecommenderSystem
@@ -40,20 +41,21 @@ class LearningPathPipeline:
         self.items = None
         self.logs = None
         self.features = None
-        self.relevance_scores = None
+        self._relevance = None
+        self._rel_stats = None
         self.recommendations = None
         
-    def run(self, users: Dict[int, Dict], items: Dict[int, Dict], 
+    def run(self, users: Union[Dict[int, Dict], UsersTable], items: Union[Dict[int, Dict], ItemsTable],
             logs: pd.DataFrame, ranking_model: str = 'random_forest',
             model_params: Dict = None, top_k: int = 5) -> Tuple[pd.DataFrame, Dict]:
         """
         Execute the complete pipeline.
         
         Args:
-            users: Dictionary of user data
-            items: Dictionary of item data
+            users: UsersTable, or dictionary of user data
+            items: ItemsTable, or dictionary of item data
             logs: DataFrame of interaction logs
-            ranking_model: Type of ranking model ('random_forest' or 'ridge')
+            ranking_model: Type of ranking model ('random_forest', 'ridge' or 'hist_gbm')
             model_params: Model hyperparameters
             top_k: Number of recommendations per user
         
@@ -62,13 +64,14 @@ class LearningPathPipeline:
         """
         self.users = users
         self.items = items
-        self.logs = logs.copy()
+        self.logs = logs
         
-        print(f"[Pipeline] Starting with {len(users)} users, {len(items)} items, {len(logs)} interactions")
+        self.data_pipeline = DataPipeline(users, items)
+        soa = self.data_pipeline.soa
+        print(f"[Pipeline] Starting with {len(soa.user_ids)} users, {len(soa.item_ids)} items, {len(logs)} interactions")
         
         # Stage 1: Data Pipeline - Extract features
         print("\n[Stage 1] Feature Extraction")
-        self.data_pipeline = DataPipeline(users, items)
         self.features = self.data_pipeline.process(self.logs)
         print(f"    Extracted features: {self.features.shape[0]} samples × {self.features.shape[1]} columns")
         
@@ -81,30 +84,44 @@ class LearningPathPipeline:
         
         # For now, use all data (in production, would use train/test split)
         feature_cols = self.data_pipeline.get_feature_columns()
-        X = self.features[feature_cols]
+        # Cast once at the pipeline boundary: a float32 matrix is half the size
+        # of the float64 columns and is what both train() and predict() consume
+        X = self.features[feature_cols].to_numpy(dtype=np.float32, copy=False)
         
         # Use relevance if available, otherwise create a simple relevance score
         if 'relevance' in self.features.columns:
-            y = self.features['relevance']
+            y = self.features['relevance'].to_numpy(dtype=np.float32)
         else:
             # Create relevance from success and quiz score
             # relevance = 0.6 * success + 0.4 * (quiz_score / 100)
-            success = self.features.get('success', 0.5)
-            quiz_score = self.features.get('quiz_score', 50.0)
-            y = 0.6 * success + 0.4 * (quiz_score / 100.0)
-        
-        self.ranking_pipeline.train(X, y, feature_columns=feature_cols)
-        relevance_pred = self.ranking_pipeline.predict(X)
+            num_rows = len(self.features)
+            if 'success' in self.features.columns:
+                success = self.features['success'].to_numpy(dtype=np.float32)
+            else:
+                success = np.full(num_rows, 0.5, dtype=np.float32)
+            if 'quiz_score' in self.features.columns:
+                quiz_score = self.features['quiz_score'].to_numpy(dtype=np.float32)
+            else:
+                quiz_score = np.full(num_rows, 50.0, dtype=np.float32)
+            y = 0.6 * success + 0.004 * quiz_score
+        
+        relevance_pred = self.ranking_pipeline.train_predict(X, y, feature_columns=feature_cols)
+        # Summary stats computed once on the raw array, reused for metadata
+        self._rel_stats = {
+            'min': float(relevance_pred.min()),
+            'max': float(relevance_pred.max()),
+            'mean': float(relevance_pred.mean()),
+            'std': float(relevance_pred.std(ddof=1)),  # sample std, as pandas reports
+        }
         print(f"    Trained {ranking_model} model")
-        print(f"    Relevance score range: [{relevance_pred.min():.3f}, {relevance_pred.max():.3f}]")
+        print(f"    Relevance score range: [{self._rel_stats['min']:.3f}, {self._rel_stats['max']:.3f}]")
         
-        # Create relevance DataFrame
-        relevance_df = pd.DataFrame({
-            'user_id': self.features['user_id'],
-            'item_id': self.features['item_id'],
-            'relevance_score': relevance_pred
-        })
-        self.relevance_scores = relevance_df
+        # Keep relevance as parallel arrays; the DataFrame is only built on request
+        self._relevance = (
+            self.features['user_id'].to_numpy(),
+            self.features['item_id'].to_numpy(),
+            relevance_pred,
+        )
         
         # Stage 3: Recommender System - Generate recommendations
         print("\n[Stage 3] Recommendation Generation")
@@ -112,7 +129,7 @@ class LearningPathPipeline:
         self.recommender.set_context(users, items)
         # Note: exclude_seen=False because we want to recommend all high-relevance items,
         # not just those the user hasn't seen
-        self.recommendations = self.recommender.recommend_batch(relevance_df, exclude_seen=False)
+        self.recommendations = self.recommender.recommend_batch_arrays(*self._relevance, exclude_seen=False)
         print(f"    Generated recommendations: {len(self.recommendations)} total")
         
         # Compute metadata
@@ -121,21 +138,29 @@ class LearningPathPipeline:
         print("\n[Pipeline] Complete!")
         return self.recommendations, metadata
     
+    @property
+    def relevance_scores(self) -> Optional[pd.DataFrame]:
+        """Predicted relevance per interaction as [user_id, item_id, relevance_score]."""
+        if self._relevance is None:
+            return None
+        user_ids, item_ids, scores = self._relevance
+        return pd.DataFrame({
+            'user_id': user_ids,
+            'item_id': item_ids,
+            'relevance_score': scores
+        })
+    
     def _compute_metadata(self) -> Dict:
         """Compute metadata about the pipeline execution."""
+        num_users = len(self.data_pipeline.soa.user_ids)
         metadata = {
-            'num_users': len(self.users),
-            'num_items': len(self.items),
+            'num_users': num_users,
+            'num_items': len(self.data_pipeline.soa.item_ids),
             'num_interactions': len(self.logs),
             'num_features': len(self.data_pipeline.get_feature_columns()),
             'num_recommendations': len(self.recommendations),
-            'avg_recommendations_per_user': len(self.recommendations) / len(self.users) if len(self.users) > 0 else 0,
-            'relevance_stats': {
-                'min': float(self.relevance_scores['relevance_score'].min()),
-                'max': float(self.relevance_scores['relevance_score'].max()),
-                'mean': float(self.relevance_scores['relevance_score'].mean()),
-                'std': float(self.relevance_scores['relevance_score'].std()),
-            }
+            'avg_recommendations_per_user': len(self.recommendations) / num_users if num_users > 0 else 0,
+            'relevance_stats': dict(self._rel_stats),
         }
         return metadata
     
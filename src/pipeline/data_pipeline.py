@@ -4,8 +4,14 @@ Data Pipeline: Handles feature extraction from interactions
 
 import pandas as pd
 import numpy as np
-from typing import Dict, Tuple
+from typing import Dict, Tuple, Union
 from ..features.interaction_features import extract_interaction_features
+from ..catalog import ItemsTable, UsersTable
+from ..features.soa import build_soa
+
+# Outcome and metadata columns that are not model features
+EXCLUDE_COLS = frozenset({'user_id', 'item_id', 'success', 'quiz_score',
+                          'time_spent', 'difficulty_gap'})
 
 
 class DataPipeline:
@@ -15,18 +21,23 @@ class DataPipeline:
     Flow: interactions logs -> feature extraction -> feature DataFrame
     """
     
-    def __init__(self, users: Dict[int, Dict], items: Dict[int, Dict]):
+    def __init__(self, users: Union[Dict[int, Dict], UsersTable],
+                 items: Union[Dict[int, Dict], ItemsTable]):
         """
         Initialize the data pipeline.
         
         Args:
-            users: Dictionary mapping user_id to user data (mastery, learning_rate, etc.)
-            items: Dictionary mapping item_id to item data (skills, difficulty, etc.)
+            users: UsersTable, or dictionary mapping user_id to user data
+                   (mastery, learning_rate, etc.)
+            items: ItemsTable, or dictionary mapping item_id to item data
+                   (skills, difficulty, etc.)
         """
         self.users = users
         self.items = items
+        self.soa = build_soa(users, items)
         self.features_df = None
         self.logs = None
+        self._feature_columns = None
         
     def process(self, logs: pd.DataFrame) -> pd.DataFrame:
         """
@@ -39,14 +50,17 @@ class DataPipeline:
         Returns:
             DataFrame with engineered features for each interaction
         """
-        self.logs = logs.copy()
+        # No copy needed: feature extraction builds a new frame and leaves logs untouched
+        self.logs = logs
         
         # Extract features from interactions
         self.features_df = extract_interaction_features(
             logs=self.logs,
             users=self.users,
-            items=self.items
+            items=self.items,
+            soa=self.soa
         )
+        self._feature_columns = [col for col in self.features_df.columns if col not in EXCLUDE_COLS]
         
         return self.features_df
     
@@ -61,7 +75,5 @@ class DataPipeline:
         if self.features_df is None:
             raise RuntimeError("Pipeline not yet run. Call process() first.")
         
-        # Exclude outcome and metadata columns
-        exclude_cols = {'user_id', 'item_id', 'success', 'quiz_score', 
-                       'time_spent', 'difficulty_gap'}
-        return [col for col in self.features_df.columns if col not in exclude_cols]
+        # Computed once in process(); copy so callers can't alter the cache
+        return list(self._feature_columns)
@@ -2,11 +2,14 @@
 Ranking Pipeline: Predicts relevance scores for user-item pairs
 """
 
+import warnings
+
 import pandas as pd
 import numpy as np
 from typing import Dict, Union
 from sklearn.preprocessing import StandardScaler
-from sklearn.ensemble import RandomForestRegressor
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
+from sklearn.inspection import permutation_importance
 from sklearn.linear_model import Ridge
 
 
@@ -22,7 +25,7 @@ class RankingPipeline:
         Initialize the ranking pipeline.
         
         Args:
-            model_type: 'random_forest' or 'ridge'
+            model_type: 'random_forest', 'ridge' or 'hist_gbm'
             model_params: Dictionary of model hyperparameters
         """
         self.model_type = model_type
@@ -32,7 +35,11 @@ class RankingPipeline:
         self.feature_columns = None
         self.is_trained = False
         
-    def train(self, X_train: pd.DataFrame, y_train: pd.Series, 
+        # Training data kept for permutation importances (hist_gbm only)
+        self._importance_data = None
+        self._feature_importances = None
+        
+    def train(self, X_train: pd.DataFrame, y_train: Union[pd.Series, np.ndarray], 
               feature_columns: list = None, scale_features: bool = True):
         """
         Train the ranking model.
@@ -43,17 +50,38 @@ class RankingPipeline:
             feature_columns: List of feature column names
             scale_features: Whether to scale features (needed for Ridge, not for RF)
         """
+        self._fit(X_train, y_train, feature_columns, scale_features)
+    
+    def train_predict(self, X_train: pd.DataFrame, y_train: Union[pd.Series, np.ndarray],
+                      feature_columns: list = None, scale_features: bool = True) -> np.ndarray:
+        """
+        Train the ranking model, then predict relevance scores for X_train.
+        
+        Same as train() followed by predict(X_train), but the training features
+        are selected, converted and scaled only once.
+        
+        Returns:
+            Array of relevance scores for the training rows
+        """
+        X_train_processed = self._fit(X_train, y_train, feature_columns, scale_features)
+        return self.model.predict(X_train_processed)
+    
+    def _fit(self, X_train: pd.DataFrame, y_train: Union[pd.Series, np.ndarray],
+             feature_columns: list, scale_features: bool) -> np.ndarray:
+        """
+        Body of train(); returns the (scaled) matrix the model was fit on.
+        """
         self.feature_columns = feature_columns or list(X_train.columns)
         
         # Prepare data
-        X_train_processed = X_train[self.feature_columns] if isinstance(X_train, pd.DataFrame) else X_train
+        X_train_processed = self._to_matrix(X_train)
         
         # Scale features if needed
         if scale_features and self.model_type == 'ridge':
             self.scaler = StandardScaler()
             X_train_processed = self.scaler.fit_transform(X_train_processed)
-        elif scale_features and self.model_type == 'random_forest':
-            # RF doesn't need scaling but we keep scaler for consistency
+        elif scale_features and self.model_type in ('random_forest', 'hist_gbm'):
+            # Tree models don't need scaling but we keep scaler for consistency
             self.scaler = None
         
         # Create and train model
@@ -61,11 +89,44 @@ class RankingPipeline:
             self.model = RandomForestRegressor(**self.model_params)
         elif self.model_type == 'ridge':
             self.model = Ridge(**self.model_params)
+        elif self.model_type == 'hist_gbm':
+            # Histogram-binned boosting: features are bucketed into uint8 bins,
+            # so training is much faster than full-depth bagged trees
+            params = {'max_iter': 200, 'learning_rate': 0.05, 'max_bins': 255}
+            params.update(self._hist_gbm_params())
+            self.model = HistGradientBoostingRegressor(**params)
         else:
             raise ValueError(f"Unknown model type: {self.model_type}")
         
         self.model.fit(X_train_processed, y_train)
         self.is_trained = True
+        
+        self._feature_importances = None
+        self._importance_data = (X_train_processed, y_train) if self.model_type == 'hist_gbm' else None
+        return X_train_processed
+    
+    def _hist_gbm_params(self) -> Dict:
+        """
+        model_params translated for HistGradientBoostingRegressor.
+        
+        Lets the forest-style RANKING_MODEL_PARAMS be reused: n_estimators
+        becomes max_iter (boosting iterations), and forest-only options the
+        booster does not accept (e.g. min_samples_split) are dropped with a
+        warning each.
+        """
+        params = dict(self.model_params)
+        if 'n_estimators' in params:
+            n_estimators = params.pop('n_estimators')
+            params.setdefault('max_iter', n_estimators)
+        accepted = HistGradientBoostingRegressor().get_params()
+        for name in params:
+            if name not in accepted:
+                warnings.warn(
+                    f"Ignoring model param '{name}': HistGradientBoostingRegressor does not accept it",
+                    UserWarning,
+                    stacklevel=2,
+                )
+        return {name: value for name, value in params.items() if name in accepted}
     
     def predict(self, X: pd.DataFrame) -> np.ndarray:
         """
@@ -81,7 +142,7 @@ class RankingPipeline:
             raise RuntimeError("Model not trained. Call train() first.")
         
         # Extract relevant columns
-        X_processed = X[self.feature_columns] if isinstance(X, pd.DataFrame) else X
+        X_processed = self._to_matrix(X)
         
         # Scale if scaler was fit
         if self.scaler is not None:
@@ -89,9 +150,25 @@ class RankingPipeline:
         
         return self.model.predict(X_processed)
     
+    def _to_matrix(self, X: Union[pd.DataFrame, np.ndarray]) -> np.ndarray:
+        """
+        Select feature columns and hand sklearn a C-contiguous float32 ndarray.
+        
+        sklearn would otherwise copy the DataFrame into an array itself inside
+        fit/predict; tree models work in float32 internally anyway. Multi-column
+        DataFrames convert to Fortran order, which the tree and BLAS code would
+        silently copy again, so the row-major layout is fixed here once.
+        """
+        if isinstance(X, pd.DataFrame):
+            X = X[self.feature_columns].to_numpy(dtype=np.float32, copy=False)
+        return np.ascontiguousarray(X, dtype=np.float32)
+    
     def get_feature_importance(self, top_n: int = 10) -> pd.DataFrame:
         """
-        Get feature importance scores (only for Random Forest).
+        Get feature importance scores (Random Forest or hist_gbm).
+        
+        hist_gbm has no impurity-based importances, so permutation importances
+        on the training data are computed on first use and cached.
         
         Args:
             top_n: Number of top features to return
@@ -99,13 +176,20 @@ class RankingPipeline:
         Returns:
             DataFrame with feature names and importance scores
         """
-        if self.model_type != 'random_forest':
-            raise ValueError("Feature importance only available for Random Forest model")
+        if self.model_type not in ('random_forest', 'hist_gbm'):
+            raise ValueError("Feature importance only available for Random Forest and hist_gbm models")
         
         if not self.is_trained:
             raise RuntimeError("Model not trained. Call train() first.")
         
-        importances = self.model.feature_importances_
+        if self.model_type == 'random_forest':
+            importances = self.model.feature_importances_
+        else:
+            if self._feature_importances is None:
+                X, y = self._importance_data
+                result = permutation_importance(self.model, X, y, n_repeats=5, random_state=0)
+                self._feature_importances = result.importances_mean
+            importances = self._feature_importances
         feature_importance_df = pd.DataFrame({
             'feature': self.feature_columns,
             'importance': importances
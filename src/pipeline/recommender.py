@@ -7,6 +7,27 @@ import numpy as np
 from typing import Dict, List, Tuple
 
 
+def _top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Positions of the k highest scores, best first; ties keep position order.
+    
+    Selects in O(M) with a partition and only sorts the k survivors, giving
+    the same result as a stable full sort by descending score.
+    """
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k < len(scores):
+        # k-th largest score; everything above it is in, ties fill the rest
+        threshold = -np.partition(-scores, k - 1)[k - 1]
+        above = np.flatnonzero(scores > threshold)
+        tied = np.flatnonzero(scores == threshold)[:k - len(above)]
+        top = np.concatenate([above, tied])
+    else:
+        top = np.arange(len(scores))
+    return top[np.lexsort((top, -scores[top]))]
+
+
 class RecommenderSystem:
     """
     System that generates personalized recommendations for each user.
@@ -51,19 +72,21 @@ class RecommenderSystem:
         Returns:
             List of (item_id, relevance_score) tuples, sorted by relevance descending
         """
-        exclude_items = exclude_items or set()
+        if not relevance_scores:
+            return []
         
-        # Filter items: must be above threshold and not excluded
-        candidate_items = [
-            (item_id, score) for item_id, score in relevance_scores.items()
-            if score >= self.min_relevance and item_id not in exclude_items
-        ]
+        ids = np.fromiter(relevance_scores.keys(), dtype=np.int64, count=len(relevance_scores))
+        scores = np.fromiter(relevance_scores.values(), dtype=np.float64, count=len(relevance_scores))
         
-        # Sort by relevance score descending
-        candidate_items.sort(key=lambda x: x[1], reverse=True)
-        
-        # Return top-K
-        return candidate_items[:self.top_k]
+        # Filter items: must be above threshold and not excluded
+        mask = scores >= self.min_relevance
+        if exclude_items:
+            mask &= ~np.isin(ids, np.fromiter(exclude_items, dtype=np.int64, count=len(exclude_items)))
+        ids = ids[mask]
+        scores = scores[mask]
+        
+        top = _top_k_indices(scores, self.top_k)
+        return list(zip(ids[top].tolist(), scores[top].tolist()))
     
     def recommend_batch(self, relevance_df: pd.DataFrame, 
                        exclude_seen: bool = True) -> pd.DataFrame:
@@ -84,30 +107,85 @@ class RecommenderSystem:
         if 'user_id' not in relevance_df.columns or 'item_id' not in relevance_df.columns:
             return pd.DataFrame(columns=['user_id', 'item_id', 'relevance_score', 'rank'])
         
-        recommendations = []
-        
-        for user_id in relevance_df['user_id'].unique():
-            user_items = relevance_df[relevance_df['user_id'] == user_id]
-            
-            # Get set of items user has seen (if exclude_seen is True)
-            exclude_items = set(user_items['item_id'].values) if exclude_seen else set()
-            
-            # Create relevance dict
-            relevance_dict = dict(zip(user_items['item_id'], user_items['relevance_score']))
-            
-            # Get recommendations
-            recs = self.recommend(user_id, relevance_dict, exclude_items=exclude_items)
-            
-            # Add to results with rank
-            for rank, (item_id, score) in enumerate(recs, 1):
-                recommendations.append({
-                    'user_id': user_id,
-                    'item_id': item_id,
-                    'relevance_score': score,
-                    'rank': rank
-                })
-        
-        return pd.DataFrame(recommendations)
+        return self.recommend_batch_arrays(
+            relevance_df['user_id'].to_numpy(),
+            relevance_df['item_id'].to_numpy(),
+            relevance_df['relevance_score'].to_numpy(),
+            exclude_seen=exclude_seen,
+        )
+    
+    def recommend_batch_arrays(self, user_ids: np.ndarray, item_ids: np.ndarray,
+                               scores: np.ndarray, exclude_seen: bool = True) -> pd.DataFrame:
+        """
+        recommend_batch on parallel (N,) arrays instead of a relevance DataFrame.
+        
+        Args:
+            user_ids: User id per scored row
+            item_ids: Item id per scored row
+            scores: Relevance score per scored row
+            exclude_seen: If True, don't recommend items user has already interacted with
+        
+        Returns:
+            DataFrame with columns [user_id, item_id, relevance_score, rank]
+        """
+        user_ids = np.asarray(user_ids)
+        item_ids = np.asarray(item_ids)
+        scores = np.asarray(scores)
+        
+        if exclude_seen or len(scores) == 0:
+            # With exclude_seen, every candidate row is an interaction the user
+            # has already had, so nothing is left to recommend
+            return pd.DataFrame(columns=['user_id', 'item_id', 'relevance_score', 'rank'])
+        
+        # Dense codes; users are numbered in order of first appearance
+        user_codes, _ = pd.factorize(user_ids)
+        item_codes, item_uniques = pd.factorize(item_ids)
+        
+        # Repeated (user, item) rows behave like the per-user dicts recommend()
+        # works on: the pair keeps the position of its first row (which decides
+        # ties) and takes the score of its last row
+        pair_codes = user_codes.astype(np.int64) * len(item_uniques) + item_codes
+        pairs = pd.Series(pair_codes, copy=False)
+        keep = ~pairs.duplicated(keep='first').to_numpy()
+        if not keep.all():
+            last = ~pairs.duplicated(keep='last').to_numpy()
+            pair_index, _ = pd.factorize(pair_codes)
+            last_score = np.empty(pair_index.max() + 1, dtype=scores.dtype)
+            last_score[pair_index[last]] = scores[last]
+            scores = last_score[pair_index]
+        keep &= scores >= self.min_relevance
+        
+        # Candidate row positions per user, users in order of first appearance
+        candidates = np.flatnonzero(keep)
+        candidates = candidates[np.argsort(user_codes[candidates], kind='stable')]
+        group_starts = np.flatnonzero(np.diff(user_codes[candidates], prepend=-1))
+        groups = np.split(candidates, group_starts[1:]) if len(candidates) else []
+        
+        # Preallocated outputs with top_k slots per user; rank 0 marks slots left
+        # empty by users with fewer candidates
+        capacity = len(groups) * self.top_k
+        row_out = np.zeros(capacity, dtype=np.intp)
+        rank_out = np.zeros(capacity, dtype=np.int64)
+        ranks = np.arange(1, self.top_k + 1)
+        
+        # Top-K within each user's rows
+        for g, rows in enumerate(groups):
+            top = rows[_top_k_indices(scores[rows], self.top_k)]
+            slot = g * self.top_k
+            row_out[slot:slot + len(top)] = top
+            rank_out[slot:slot + len(top)] = ranks[:len(top)]
+        
+        filled = rank_out > 0
+        if not filled.any():
+            return pd.DataFrame(columns=['user_id', 'item_id', 'relevance_score', 'rank'])
+        
+        rows = row_out[filled]
+        return pd.DataFrame({
+            'user_id': user_ids[rows],
+            'item_id': item_ids[rows],
+            'relevance_score': scores[rows],
+            'rank': rank_out[filled],
+        })
     
     def get_recommendations_for_user(self, user_id: int, 
                                     recommendations_df: pd.DataFrame) -> pd.DataFrame:
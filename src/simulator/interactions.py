@@ -1,48 +1,97 @@
 import numpy as np
-from typing import Dict
+from typing import Dict, List, Union
 
-def sigmoid(x: float) -> float:
-    """Numerically stable sigmoid"""
-    return 1.0 / (1.0 + np.exp(-x))
+from ..catalog import ItemsTable, UsersTable
+from ..jit import njit
+from .items import skills_normalized
 
+class RandomPool:
+    """
+    Hands out uniform / standard normal draws from pre-drawn blocks
 
-def simulate_interaction(
-        user: Dict,
-        item: Dict,
-        rng: np.random.Generator
-) -> Dict:
+    Each block is one call into the generator; single values are then read from
+    a Python list, avoiding a Python -> C round-trip per draw. Blocks are
+    refilled lazily when exhausted.
     """
-    Simulate a single user-item interaction
 
-    Returns an interaction record containing:
-        - Success
-        - Quiz score
-        - Time spend
-        - Updated mastery
+    def __init__(self, rng: np.random.Generator, block_size: int = 4096):
+        self.rng = rng
+        self.block_size = max(1, int(block_size))
+        self._uniform: List[float] = []
+        self._normal: List[float] = []
+        self._uniform_pos = 0
+        self._normal_pos = 0
+
+    def random(self) -> float:
+        """Next uniform draw in [0, 1)"""
+        if self._uniform_pos == len(self._uniform):
+            self._uniform = self.rng.random(self.block_size).tolist()
+            self._uniform_pos = 0
+        value = self._uniform[self._uniform_pos]
+        self._uniform_pos += 1
+        return value
+
+    def standard_normal(self) -> float:
+        """Next standard normal draw"""
+        if self._normal_pos == len(self._normal):
+            self._normal = self.rng.standard_normal(self.block_size).tolist()
+            self._normal_pos = 0
+        value = self._normal[self._normal_pos]
+        self._normal_pos += 1
+        return value
+
+    def normal(self, loc: float = 0.0, scale: float = 1.0) -> float:
+        """Next normal draw with the given mean and standard deviation"""
+        return loc + scale * self.standard_normal()
+
+
+def sigmoid(x: Union[float, np.ndarray]) -> np.ndarray:
     """
+    Numerically stable sigmoid, elementwise over arrays
 
-    # Get user parameters
-    mastery              = user["mastery"]
-    learning_rate        = user["learning_rate"]
-    difficulty_tolerance = user["difficulty_tolerance"]
-    dropout_sensitivity  = user["dropout_sensitivity"]
+    exp only ever sees -|x|, so it cannot overflow for large negative inputs.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    e = np.exp(-np.abs(x))
+    return np.where(x >= 0, 1.0 / (1.0 + e), e / (1.0 + e))
 
-    # Get item parameters
-    item_skills          = item["skills"]
-    difficulty           = item["difficulty"]
-    estimated_time       = item["estimated_time"]
-    prerequisites        = item["prerequisites"]
 
+@njit(cache=True, fastmath=True)
+def simulate_core(
+        mastery,
+        item_skills,
+        skills_normalized,
+        skill_count,
+        learning_rate,
+        difficulty_tolerance,
+        difficulty,
+        estimated_time,
+        u01,
+        z_quiz,
+        z_time,
+        alpha
+):
+    """
+    Numeric body of simulate_interaction, compiled with Numba when available
 
+    Works on plain arrays and scalars with explicit loops over the skill vector.
+    Random numbers are drawn by the caller (u01 uniform, z_quiz / z_time
+    standard normal). alpha weights skill match in the success logit.
+    Mastery is updated in place on success.
+
+    Returns:
+        (success, quiz_score, time_spent, skill_match, difficulty_gap, skill_gain)
+    """
+    num_skills = mastery.shape[0]
 
     # ----------------
     # Skill match
     # ---------------
-    skill_count = np.sum(item_skills)
-    if skill_count == 0:
-        skill_match = 0.0
-    else:
-        skill_match = np.dot(mastery, item_skills) / skill_count
+    # skills_normalized is item_skills / skill_count, so this is the mean
+    # mastery over the item's skills
+    skill_match = 0.0
+    for k in range(num_skills):
+        skill_match += mastery[k] * skills_normalized[k]
 
 
     # ------------------
@@ -54,73 +103,265 @@ def simulate_interaction(
     # -------------------
     # Success probability
     # ------------------
-    alpha = 10.0 # Weight on mastery
     beta = 1.0  # penalty for difficulty
 
     logit = alpha * skill_match - beta * difficulty_gap
-    success_prob = sigmoid(logit)
 
-    success = rng.random() < success_prob
+    # Stable sigmoid (scalar form of sigmoid above)
+    e = np.exp(-abs(logit))
+    success_prob = 1.0 / (1.0 + e) if logit >= 0 else e / (1.0 + e)
+
+    success = u01 < success_prob
 
 
     # ------------------------
     # Quiz score
     # ------------------------
     if success:
-        quiz_score = rng.normal(loc=80 + 20 * skill_match, scale=5)
+        quiz_score = 80 + 20 * skill_match + 5 * z_quiz
     else:
-        quiz_score = rng.normal(loc=40 + 20 * skill_match, scale=10)
+        quiz_score = 40 + 20 * skill_match + 10 * z_quiz
 
-    quiz_score = float(np.clip(quiz_score, 0, 100))
+    quiz_score = min(max(quiz_score, 0.0), 100.0)
 
     # --------------------
     # Time spent
     # -------------------
-    time_noise = rng.normal(0, 2)
-
-    if success:
-        time_spent = estimated_time * (1.0 + 0.1 * difficulty_gap) + time_noise
-    else:
-        time_spent = estimated_time * (1.5 + 0.2 * difficulty_gap) + time_noise
+    time_noise = 2 * z_time
 
-    time_spent = max(1.0, time_spent)
+    # Success: est * (1.0 + 0.1 * gap), failure: est * (1.5 + 0.2 * gap), as arithmetic
+    failed = 1.0 - success
+    time_base = 1.0 + 0.5 * failed
+    time_coef = 0.1 + 0.1 * failed
+    time_spent = max(1.0, estimated_time * (time_base + time_coef * difficulty_gap) + time_noise)
 
 
     # -------------------
     # Mastery update
     # -------------------
-    mastery_before = user["mastery"].copy()
-    
+    # Skill gain is the average change in mastery over the item's skills
+    total_gain = 0.0
     if success:
-        mastery_update = learning_rate * item_skills * (1.0 - mastery)
-        user["mastery"] = np.clip(mastery + mastery_update, 0.0, 1.0)
-    
-    mastery_after = user["mastery"].copy()
-    
-    # Calculate skill gain (average change in mastery for relevant skills)
-    relevant_skills = item_skills.astype(bool)
-    if relevant_skills.any():
-        skill_gain = np.mean(mastery_after[relevant_skills] - mastery_before[relevant_skills])
-    else:
-        skill_gain = 0.0
-    
+        for k in range(num_skills):
+            before = mastery[k]
+            after = before + learning_rate * item_skills[k] * (1.0 - before)
+            mastery[k] = min(max(after, 0.0), 1.0)
+            if item_skills[k] != 0:
+                total_gain += mastery[k] - before
+
+    skill_gain = total_gain / skill_count if skill_count > 0 else 0.0
+
     # Normalize skill_gain to [0, 1]
-    skill_gain = float(np.clip(skill_gain, 0.0, 1.0))
+    skill_gain = min(max(skill_gain, 0.0), 1.0)
+
+    return success, quiz_score, time_spent, skill_match, difficulty_gap, skill_gain
+
+
+def simulate_interaction(
+        user: Dict,
+        item: Dict,
+        rng: Union[np.random.Generator, RandomPool],
+        alpha: float = 10.0,
+        return_extended: bool = False
+) -> Dict:
+    """
+    Simulate a single user-item interaction
+
+    rng may be a RandomPool so the three draws per interaction come from
+    pre-drawn blocks. alpha is the weight on skill match in the success logit.
+
+    Returns an interaction record containing:
+        - Success
+        - Quiz score
+        - Time spend
+        - Skill match and difficulty gap
+        - With return_extended: item/user attributes and skill gain used as
+          training features (difficulty, dropout_sensitivity,
+          num_prerequisites, estimated_time, skill_gain)
+
+    Mastery is updated in place on success.
+    """
+    u01 = rng.random()
+    z_quiz = rng.standard_normal()
+    z_time = rng.standard_normal()
+
+    success, quiz_score, time_spent, skill_match, difficulty_gap, skill_gain = simulate_core(
+        user["mastery"],
+        item["skills"],
+        skills_normalized(item),
+        item["skill_count"],
+        user["learning_rate"],
+        user["difficulty_tolerance"],
+        float(item["difficulty"]),
+        item["estimated_time"],
+        u01,
+        z_quiz,
+        z_time,
+        alpha,
+    )
 
     interaction = {
         "user_id": user["user_id"],
         "item_id": item["item_id"],
         "success": int(success),
+        "quiz_score": float(quiz_score),
+        "time_spent": float(time_spent),
+        "skill_match": float(skill_match),
+        "difficulty_gap": float(difficulty_gap),
+    }
+
+    if return_extended:
+        interaction["difficulty"] = item["difficulty"]
+        interaction["dropout_sensitivity"] = user["dropout_sensitivity"]
+        interaction["num_prerequisites"] = len(item["prerequisites"])
+        interaction["estimated_time"] = item["estimated_time"]
+        interaction["skill_gain"] = float(skill_gain)
+
+    return interaction
+
+
+def simulate_interactions_batch(
+        users: UsersTable,
+        items: ItemsTable,
+        pairs: np.ndarray,
+        rng: np.random.Generator,
+        alpha: float = 10.0
+) -> Dict[str, np.ndarray]:
+    """
+    Simulate many independent user-item interactions in one NumPy pass
+
+    Same model as simulate_interaction, applied to arrays instead of dicts.
+    All interactions see the mastery state at call time, so a user should
+    appear at most once per batch (e.g. one simulation step across users).
+    Mastery of successful users is updated in place in users.mastery.
+
+    Args:
+        users: User catalog arrays (UsersTable.from_dicts for dict catalogs)
+        items: Item catalog arrays (ItemsTable.from_dicts for dict catalogs)
+        pairs: (N, 2) int array of (user_row, item_row); id_to_idx maps ids to rows
+        rng: Random generator; all noise is drawn in bulk
+        alpha: Weight on skill match in the success logit
+
+    Returns:
+        Dict of column name -> (N,) array, with the keys of simulate_interaction
+    """
+    n = len(pairs)
+    u01 = rng.random(n)
+    z_quiz = rng.standard_normal(n)
+    z_time = rng.standard_normal(n)
+    return simulate_batch_core(users, items, pairs, u01, z_quiz, z_time, alpha)
+
+
+def simulate_batch_core(
+        users: UsersTable,
+        items: ItemsTable,
+        pairs: np.ndarray,
+        u01: np.ndarray,
+        z_quiz: np.ndarray,
+        z_time: np.ndarray,
+        alpha: float = 10.0
+) -> Dict[str, np.ndarray]:
+    """
+    simulate_interactions_batch on random numbers drawn by the caller
+
+    The batch counterpart of simulate_core: u01 are (N,) uniforms, z_quiz /
+    z_time (N,) standard normals. Sums over the skill vector and the mastery
+    update run in float64 like simulate_core, so both give the same results
+    for the same draws.
+    """
+    u = pairs[:, 0]
+    i = pairs[:, 1]
+    n = len(pairs)
+
+    mastery       = users.mastery[u]
+    learning_rate = users.learning_rate[u]
+    item_skills   = items.skills[i]
+    skill_count   = items.skill_count[i]
+    difficulty    = items.difficulty[i]
+    estimated_time = items.estimated_time[i]
+
+
+    # ----------------
+    # Skill match
+    # ---------------
+    has_skills = skill_count > 0
+    skill_match = np.divide(
+        np.einsum("ij,ij->i", mastery, item_skills, dtype=np.float64),
+        skill_count,
+        out=np.zeros(n, dtype=np.float64),
+        where=has_skills,
+    )
+
+
+    # ------------------
+    # Difficulty gap
+    # ------------------
+    difficulty_gap = difficulty / users.difficulty_tolerance[u]
+
+
+    # -------------------
+    # Success probability
+    # ------------------
+    beta = 1.0  # penalty for difficulty
+
+    logit = alpha * skill_match - beta * difficulty_gap
+    success_prob = sigmoid(logit)
+
+    success = u01 < success_prob
+
+
+    # ------------------------
+    # Quiz score
+    # ------------------------
+    quiz_mean = np.where(success, 80.0, 40.0) + 20 * skill_match
+    quiz_scale = np.where(success, 5.0, 10.0)
+    quiz_score = quiz_scale * z_quiz
+    quiz_score += quiz_mean
+    np.minimum(100.0, np.maximum(0.0, quiz_score, out=quiz_score), out=quiz_score)
+
+    # --------------------
+    # Time spent
+    # -------------------
+    time_noise = 2.0 * z_time
+    time_base = np.where(success, 1.0, 1.5)
+    time_coef = np.where(success, 0.1, 0.2)
+    time_spent = time_coef * difficulty_gap
+    time_spent += time_base
+    time_spent *= estimated_time
+    time_spent += time_noise
+    np.maximum(1.0, time_spent, out=time_spent)
+
+
+    # -------------------
+    # Mastery update
+    # -------------------
+    # Clipping runs in place on the updated rows instead of on temporaries
+    mastery_after = (learning_rate * success)[:, None] * item_skills * (1.0 - mastery)
+    mastery_after += mastery
+    np.minimum(1.0, np.maximum(0.0, mastery_after, out=mastery_after), out=mastery_after)
+    mastery_after = mastery_after.astype(mastery.dtype)
+    users.mastery[u] = mastery_after
+
+    # Average change in mastery over the item's skills, normalized to [0, 1]
+    skill_gain = np.divide(
+        ((mastery_after - mastery) * item_skills).sum(axis=1, dtype=np.float64),
+        skill_count,
+        out=np.zeros(n, dtype=np.float64),
+        where=has_skills,
+    )
+    np.clip(skill_gain, 0.0, 1.0, out=skill_gain)
+
+    return {
+        "user_id": users.user_ids[u],
+        "item_id": items.item_ids[i],
+        "success": success.astype(np.int64),
         "quiz_score": quiz_score,
         "time_spent": time_spent,
         "skill_match": skill_match,
         "difficulty_gap": difficulty_gap,
-        "difficulty": difficulty,
-        "dropout_sensitivity": dropout_sensitivity,
-        "num_prerequisites": len(prerequisites),
+        "difficulty": difficulty.astype(np.int64),
+        "dropout_sensitivity": users.dropout_sensitivity[u],
+        "num_prerequisites": items.num_prerequisites[i],
         "estimated_time": estimated_time,
-        "skill_gain": skill_gain
+        "skill_gain": skill_gain,
     }
-
-    return interaction
-
@@ -1,14 +1,96 @@
 import numpy as np
-from typing import Dict, List
+from typing import Dict
+
+from ..catalog import ItemsTable, inverse_counts
+
+def generate_items_table(
+    num_items: int,
+    num_skills: int = 8,
+    random_seed: int = 42
+) -> ItemsTable:
+    
+    """
+    Generate a catalog of learning items as parallel arrays.
+
+    Each item has:
+        - A binary skill coverage vector
+        - A discrete difficulty level
+        - Prerequisite skills (as a boolean skill mask)
+        - An estimated completion time
+
+    Returns:
+        ItemsTable with item ids 0..num_items-1
+    """
+
+    rng = np.random.default_rng(random_seed)
+
+    # All randomness is drawn for the whole catalog at once
+
+    # -----------------
+    # Difficulty
+    # -----------------
+    difficulty = rng.integers(1, 6, size=num_items) # 1 to 5 inclusive
+
+
+    # -----------------
+    # Skill coverage
+    # -----------------
+
+    # Pick random skills: each row keeps the num_item_skills skills with the
+    # smallest random keys, i.e. a uniform sample without replacement
+    num_item_skills = rng.integers(1, min(7, num_skills + 1), size=num_items)
+    skill_keys = rng.random((num_items, num_skills))
+    skill_ranks = np.argsort(np.argsort(skill_keys, axis=1), axis=1)
+    skills_bool = skill_ranks < num_item_skills[:, None]
+    skill_matrix = skills_bool.astype(np.uint8)
+
+    # ----------------
+    # Prerequisites
+    # ----------------
+    # Only allow prerequisites from earlier skills: each covered skill s > 0 of
+    # an item with difficulty >= 3 adds a random skill in [0, s) with prob 0.5
+    skill_index = np.arange(num_skills)
+    adds_prereq = (
+        skills_bool
+        & (skill_index > 0)
+        & (difficulty[:, None] >= 3)
+        & (rng.random((num_items, num_skills)) < 0.5)
+    )
+    prereq_draws = rng.random((num_items, num_skills))
+
+    # Build the (items, skills) prerequisite mask directly from the selected
+    # (item, skill) cells; repeated picks collapse onto the same cell
+    prereq_items, prereq_sources = np.nonzero(adds_prereq)
+    prereq_skill = (prereq_draws[prereq_items, prereq_sources] * prereq_sources).astype(np.intp)
+    prerequisites = np.zeros((num_items, num_skills), dtype=np.bool_)
+    prerequisites[prereq_items, prereq_skill] = True
+
+    # ----------------
+    # Estimated time
+    # ----------------
+    base_time = 10 # minutes
+    estimated_time = np.maximum(5.0, base_time * difficulty + rng.normal(0, 2, size=num_items))
+
+    return ItemsTable(
+        item_ids=np.arange(num_items, dtype=np.int64),
+        skills=skill_matrix,
+        skill_count=num_item_skills.astype(np.int32),
+        inv_skill_count=inverse_counts(num_item_skills),
+        difficulty=difficulty.astype(np.int8),
+        num_prerequisites=prerequisites.sum(axis=1).astype(np.int32),
+        estimated_time=estimated_time,
+        prerequisites=prerequisites,
+        id_to_idx={item_id: item_id for item_id in range(num_items)},
+    )
+
 
 def generate_items(
     num_items: int,
     num_skills: int = 8,
     random_seed: int = 42
 ) -> Dict[int, Dict]:
-    
     """
-    Generate a catalog of learning items.
+    Generate a catalog of learning items in the dict format.
 
     Each item has:
         - A binary skill coverage vector
@@ -17,62 +99,30 @@ def generate_items(
         - An estimated completion time
 
     Returns:
-        Dict[item_id, item_dict]
+        Dict[item_id, item_dict], built from generate_items_table
     """
+    return generate_items_table(num_items, num_skills, random_seed).to_dicts()
 
-    rng = np.random.default_rng(random_seed)
-    items = {}
-
-    for item_id in range(num_items):
-        # -----------------
-        # Difficulty
-        # -----------------
-        difficulty = rng.integers(1, 6) # 1 to 5 inclusive
-
-
-        # -----------------
-        # Skill coverage
-        # -----------------
-        
-        # Pick random skills
-        num_item_skills = rng.integers(1, min(7, num_skills + 1)) 
-        skill_indices = rng.choice(num_skills, size=num_item_skills, replace=False)
-    
-        skill_vector = np.zeros(num_skills, dtype=np.float32)
-        skill_vector[skill_indices] = 1.0
-
-        # ----------------
-        # Prerequisites
-        # ----------------
-        prerequisites: List[int] = []
-        if difficulty >= 3:
-            for s in skill_indices:
-                # Only allow prerequisites from earlier skills
-                if s > 0 and rng.random() < 0.5:
-                    prereq_skill = rng.integers(0, s)
-                    prerequisites.append(prereq_skill)
-
-        prerequisites = list(set(prerequisites)) # remove duplicates
-
-        # ----------------
-        # Estimated time
-        # ----------------
-        base_time = 10 # minutes
-        estimated_time = base_time * difficulty + rng.normal(0, 2)
-
-        item = {
-            "item_id": item_id,
-            "skills": skill_vector,
-            "difficulty": difficulty,
-            "prerequisites": prerequisites,
-            "estimated_time": max(5.0, estimated_time) 
-        }
-
-        items[item_id] = item
-
-    return items
+
+def skills_normalized(item: Dict) -> np.ndarray:
+    """
+    Item skill vector divided by its skill count (all zeros for no skills).
+
+    np.dot(mastery, skills_normalized(item)) is the user's mean mastery over the
+    item's skills. Computed and cached on the item dict if it is missing.
+    """
+    normalized = item.get("skills_normalized")
+    if normalized is None:
+        skills = item["skills"]
+        skill_count = int(np.count_nonzero(skills))
+        item["skill_count"] = skill_count
+        normalized = skills / np.float32(max(skill_count, 1))
+        item["skills_normalized"] = normalized
+    return normalized
 
 # ----------- Sanity Check --------- #
-# items = generate_items(5, 6)
-# for item in items.values():
-#     print(item)
\ No newline at end of file
+# Run with: python -m src.simulator.items
+if __name__ == "__main__":
+    items = generate_items(5, 6)
+    for item in items.values():
+        print(item)
@@ -1,10 +1,15 @@
 import numpy as np
 import pandas as pd
-from typing import Dict, List
+from typing import Dict, Tuple, Union
 
-from .interactions import simulate_interaction
+from ..catalog import ItemsTable, UsersTable
+from ..jit import NUMBA_AVAILABLE, njit, prange
+from .interactions import simulate_batch_core, simulate_core
 
-def prerequisites_satisfied(user: Dict, item: Dict, threshold: float = 0.6) -> bool:
+# Mastery a user needs on every prerequisite skill of an item
+PREREQ_THRESHOLD = 0.6
+
+def prerequisites_satisfied(user: Dict, item: Dict, threshold: float = PREREQ_THRESHOLD) -> bool:
         """
         Check whether a user's mastery satisfies an item's prerequisite skills
         """
@@ -16,97 +21,461 @@ def prerequisites_satisfied(user: Dict, item: Dict, threshold: float = 0.6) -> b
         return True
 
 
-def select_item(user: Dict, items: Dict[int, Dict], rng: np.random.Generator) -> Dict:
+def select_item(user: Dict, catalog: ItemsTable, rng: np.random.Generator) -> int:
     """
     Select the next item for a user based on current mastery and difficulty
+
+    Every item is scored against the catalog arrays (ItemsTable.from_dicts)
+    and disallowed ones get zero probability.
+
+    Returns:
+        Row index of the chosen item in `catalog`
+    """
+    mastery = np.asarray(user["mastery"], dtype=np.float32)
+    return int(_select_rows(mastery[None, :], catalog, np.array([rng.random()]))[0])
+
+
+def _select_rows(mastery: np.ndarray, catalog: ItemsTable, u01: np.ndarray) -> np.ndarray:
+    """
+    select_item for N users at once, with their uniform draws u01
+
+    Scores the whole (users x items) grid in a few matrix ops. Matches
+    _select_row: float32 scores, accumulated in float64.
+
+    Returns:
+        (N,) row indices into `catalog`
     """
-    candidates: List[Dict] = []
+    # Only items whose prerequisites are satisfied are candidates: an item is
+    # ruled out if any prerequisite skill is below threshold. The threshold
+    # test runs once per skill, not once per (item, prerequisite)
+    below = mastery < PREREQ_THRESHOLD
+    allowed = ~(below @ catalog.prerequisites.T)
+
+    # If nothing satisfies prepreqs, every item is a candidate
+    allowed[~allowed.any(axis=1)] = True
+
+    # Mean mastery over each item's skills, for every (user, item) in one matmul
+    avg_mastery = (mastery.astype(np.float64) @ catalog.skills.T).astype(np.float32)
+    avg_mastery *= catalog.inv_skill_count
 
-    for item in items.values():
-        if prerequisites_satisfied(user, item):
-             candidates.append(item)
+    # Perfer slightly challenging items
+    difficulty_gap = np.abs(catalog.difficulty - (avg_mastery * np.float32(5.0) + np.float32(1.0)))
+    scores = np.where(allowed, np.exp(-difficulty_gap), np.float32(0.0))
 
-    # If nothing satisfies prepreqs
-    if not candidates:
-         candidates = list(items.values())
+    # Inverse-CDF sampling: the first row whose cumulative score passes the
+    # uniform draw (zero-score rows can never be picked)
+    cumulative = np.cumsum(scores, axis=1, dtype=np.float64)
+    rows = np.count_nonzero(cumulative <= (u01 * cumulative[:, -1])[:, None], axis=1)
+    past_end = rows == scores.shape[1]
+    if past_end.any():
+        # Rounding put the draw at the very end of the last interval
+        last_positive = scores.shape[1] - 1 - np.argmax(scores[:, ::-1] > 0, axis=1)
+        rows[past_end] = last_positive[past_end]
+    return rows
 
-    scores = []
-    mastery = user["mastery"]
+# One interaction log row; _simulate_users fills a preallocated buffer of these
+LOG_DTYPE = np.dtype([
+    ("user_id", np.int64),
+    ("item_id", np.int64),
+    ("success", np.int64),
+    ("quiz_score", np.float64),
+    ("time_spent", np.float64),
+    ("skill_match", np.float64),
+    ("difficulty_gap", np.float64),
+    ("difficulty", np.int64),
+    ("dropout_sensitivity", np.float64),
+    ("num_prerequisites", np.int64),
+    ("estimated_time", np.float64),
+    ("skill_gain", np.float64),
+    ("step", np.int64),
+])
 
-    for item in candidates:
-        item_skills = item["skills"]
-        skill_count = np.sum(item_skills)
 
-        if skill_count == 0:
-            avg_mastery = 0.0
-        else:
-            avg_mastery = np.dot(mastery, item_skills) / skill_count
+def _items_by_skill(mask: np.ndarray):
+    """
+    For each skill k, the rows i with mask[i, k] set, in CSR form
+
+    Returns:
+        (indptr, rows): skill k's rows are rows[indptr[k]:indptr[k + 1]]
+    """
+    skill_of, rows = np.nonzero(mask.T)
+    indptr = np.zeros(mask.shape[1] + 1, dtype=np.int64)
+    np.cumsum(np.bincount(skill_of, minlength=mask.shape[1]), out=indptr[1:])
+    return indptr, rows.astype(np.int64)
+
+
+@njit(cache=True, fastmath=True)
+def _init_item_cache(mastery, skills, prerequisites, covered, num_violated):
+    """
+    Per-item state a user's selection scores are built from
+
+    covered[i] is the user's mastery summed over item i's skills (kept in
+    float64 so incremental updates do not drift), num_violated[i] the number
+    of item i's prerequisite skills below PREREQ_THRESHOLD.
+    """
+    num_items, num_skills = skills.shape
+
+    # Threshold test once per skill, shared by every item
+    below = mastery < PREREQ_THRESHOLD
+
+    for i in range(num_items):
+        total = 0.0
+        violated = 0
+        for k in range(num_skills):
+            # Binary uint8 skills: a masked add instead of a multiply
+            if skills[i, k]:
+                total += mastery[k]
+            if prerequisites[i, k] and below[k]:
+                violated += 1
+        covered[i] = total
+        num_violated[i] = violated
+
+
+@njit(cache=True, fastmath=True)
+def _update_item_cache(
+    mastery, previous, skill_items_ptr, skill_items, prereq_items_ptr, prereq_items, covered, num_violated
+):
+    """
+    Bring _init_item_cache state from `previous` mastery up to `mastery`
+
+    Only skills whose mastery changed are visited, and for each only the items
+    covering it (or requiring it), so a step touching a couple of skills costs
+    O(items per skill) instead of a full (items x skills) pass.
+    """
+    for k in range(mastery.shape[0]):
+        delta = mastery[k] - previous[k]
+        if delta == 0.0:
+            continue
 
+        for p in range(skill_items_ptr[k], skill_items_ptr[k + 1]):
+            covered[skill_items[p]] += delta
+
+        was_below = previous[k] < PREREQ_THRESHOLD
+        is_below = mastery[k] < PREREQ_THRESHOLD
+        if was_below != is_below:
+            change = -1 if was_below else 1
+            for p in range(prereq_items_ptr[k], prereq_items_ptr[k + 1]):
+                num_violated[prereq_items[p]] += change
+
+
+@njit(cache=True, fastmath=True)
+def _score_items(covered, num_violated, inv_skill_count, difficulty, out):
+    """
+    Selection score of every item for one user, written into `out`
+
+    Reads the per-item state kept by _init_item_cache / _update_item_cache and
+    computes exp(-|difficulty - (avg_mastery * 5 + 1)|) in one O(items) pass
+    with no temporary arrays. Items with unmet prerequisites score 0, unless no
+    item has its prerequisites met.
+
+    Scoring runs in float32 (`out` is float32, difficulty is int8 widened per
+    item), so twice as many items fit in each SIMD register as in float64.
+
+    Returns:
+        Sum of the scores, accumulated in float64
+    """
+    num_items = covered.shape[0]
+
+    # Scores are positive; a negative sign marks an item with unmet prerequisites
+    any_allowed = False
+    for i in range(num_items):
+        ok = num_violated[i] == 0
+        avg_mastery = np.float32(covered[i]) * inv_skill_count[i]
         # Perfer slightly challenging items
-        difficulty_gap = abs(item["difficulty"] - (avg_mastery * 5 + 1))
-        score = np.exp(-difficulty_gap)
-        scores.append(score)
+        score = np.exp(-abs(np.float32(difficulty[i]) - (avg_mastery * np.float32(5.0) + np.float32(1.0))))
+        out[i] = score if ok else -score
+        any_allowed = any_allowed or ok
+
+    total = 0.0
+    for i in range(num_items):
+        if out[i] < 0.0:
+            out[i] = 0.0 if any_allowed else -out[i]
+        total += out[i]
+    return total
+
+
+@njit(cache=True, fastmath=True)
+def _select_row(covered, num_violated, inv_skill_count, difficulty, u01, scores):
+    """
+    select_item for the compiled simulation loop
+
+    Scores every item into the scratch array `scores` and samples a row by
+    inverting the cumulative score with the uniform draw u01.
+    """
+    total = _score_items(covered, num_violated, inv_skill_count, difficulty, scores)
+
+    target = u01 * total
+    cumulative = 0.0
+    last_positive = 0
+    for i in range(scores.shape[0]):
+        if scores[i] > 0.0:
+            cumulative += scores[i]
+            last_positive = i
+            if cumulative > target:
+                return i
+    return last_positive
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _simulate_users(
+    logs,
+    user_ids,
+    mastery,
+    learning_rate,
+    difficulty_tolerance,
+    dropout_sensitivity,
+    skills,
+    skills_normalized,
+    skill_count,
+    inv_skill_count,
+    item_ids,
+    difficulty,
+    num_prerequisites,
+    estimated_time,
+    prerequisites,
+    skill_items_ptr,
+    skill_items,
+    prereq_items_ptr,
+    prereq_items,
+    uniforms,
+    normals,
+    alpha
+):
+    """
+    Whole simulation loop over users and steps, compiled with Numba when available
+
+    Random numbers are pre-drawn per (user, step): uniforms[..., 0] picks the
+    item, [..., 1] decides success, [..., 2] the dropout check; normals feed
+    quiz and time noise. Mastery rows are updated in place.
+
+    Item selection works from per-item mastery sums and prerequisite counts
+    that are built once per user and then updated only for the skills a
+    successful step changed. skill_items / prereq_items are the
+    _items_by_skill lists of the skills and prerequisites matrices.
+
+    Users' trajectories are independent, so they run in parallel (prange).
+    Each user reads only its own random numbers and writes only its own output
+    rows, so results do not depend on the number of threads.
+
+    logs is a LOG_DTYPE buffer of num_users * max_steps rows, written in
+    place: user u's steps go to rows u * max_steps onwards.
+
+    Returns:
+        lengths: number of steps taken per user
+    """
+    num_users, max_steps = uniforms.shape[0], uniforms.shape[1]
+    lengths = np.zeros(num_users, dtype=np.int64)
 
-    scores = np.array(scores)
-    probs = scores / scores.sum()
+    for u in prange(num_users):
+        user_mastery = mastery[u]
+        consecutive_failures = 0
+
+        # Per-user scratch, reused by every step
+        scores = np.empty(difficulty.shape[0], dtype=np.float32)
+        covered = np.empty(difficulty.shape[0])
+        num_violated = np.empty(difficulty.shape[0], dtype=np.int32)
+        previous = np.empty_like(user_mastery)
+        _init_item_cache(user_mastery, skills, prerequisites, covered, num_violated)
+
+        for step in range(max_steps):
+            i = _select_row(covered, num_violated, inv_skill_count, difficulty, uniforms[u, step, 0], scores)
+            previous[:] = user_mastery
+
+            success, quiz_score, time_spent, skill_match, difficulty_gap, skill_gain = simulate_core(
+                user_mastery,
+                skills[i],
+                skills_normalized[i],
+                skill_count[i],
+                learning_rate[u],
+                difficulty_tolerance[u],
+                difficulty[i],
+                estimated_time[i],
+                uniforms[u, step, 1],
+                normals[u, step, 0],
+                normals[u, step, 1],
+                alpha,
+            )
+
+            log = logs[u * max_steps + step]
+            log["user_id"] = user_ids[u]
+            log["item_id"] = item_ids[i]
+            log["success"] = success
+            log["quiz_score"] = quiz_score
+            log["time_spent"] = time_spent
+            log["skill_match"] = skill_match
+            log["difficulty_gap"] = difficulty_gap
+            log["difficulty"] = difficulty[i]
+            log["dropout_sensitivity"] = dropout_sensitivity[u]
+            log["num_prerequisites"] = num_prerequisites[i]
+            log["estimated_time"] = estimated_time[i]
+            log["skill_gain"] = skill_gain
+            log["step"] = step
+            lengths[u] = step + 1
+
+            # Update failure count; only a success changes mastery
+            if success:
+                _update_item_cache(
+                    user_mastery, previous, skill_items_ptr, skill_items, prereq_items_ptr, prereq_items,
+                    covered, num_violated,
+                )
+                consecutive_failures = 0
+            else:
+                consecutive_failures += 1
+
+            # Dropout check
+            dropout_prob = min(1.0, 0.1 * consecutive_failures * dropout_sensitivity[u])
+            if uniforms[u, step, 2] < dropout_prob:
+                break
+
+    return lengths
+
+
+def _simulate_steps(logs, users: UsersTable, items: ItemsTable, uniforms, normals, alpha):
+    """
+    _simulate_users in NumPy, for when Numba is not installed
+
+    Interpreted, _simulate_users pays Python overhead per user, step, item and
+    skill. Here all users still active take each step together instead:
+    _select_rows picks their items and simulate_batch_core runs the
+    interactions, one vectorized pass per step. Reads the same random numbers
+    and fills the same logs rows as _simulate_users.
+
+    Returns:
+        lengths: number of steps taken per user
+    """
+    num_users, max_steps = uniforms.shape[0], uniforms.shape[1]
+    lengths = np.zeros(num_users, dtype=np.int64)
+    consecutive_failures = np.zeros(num_users, dtype=np.int64)
+    active = np.arange(num_users)
+
+    for step in range(max_steps):
+        if len(active) == 0:
+            break
+
+        rows = _select_rows(users.mastery[active], items, uniforms[active, step, 0])
+        interactions = simulate_batch_core(
+            users,
+            items,
+            np.column_stack([active, rows]),
+            uniforms[active, step, 1],
+            normals[active, step, 0],
+            normals[active, step, 1],
+            alpha,
+        )
+
+        out = active * max_steps + step
+        for name, values in interactions.items():
+            logs[name][out] = values
+        logs["step"][out] = step
+        lengths[active] = step + 1
+
+        # Update failure counts, then drop out the users whose check fails
+        success = interactions["success"] == 1
+        consecutive_failures[active] = np.where(success, 0, consecutive_failures[active] + 1)
+        dropout_prob = np.minimum(1.0, 0.1 * consecutive_failures[active] * users.dropout_sensitivity[active])
+        active = active[uniforms[active, step, 2] >= dropout_prob]
+
+    return lengths
 
-    return rng.choice(candidates, p=probs)
 
 def run_simulation_core(
-    users: Dict[int, Dict],
-    items: Dict[int, Dict],
+    users: Union[Dict[int, Dict], UsersTable],
+    items: Union[Dict[int, Dict], ItemsTable],
     max_steps: int = 50,
-    seed: int = 42
+    seed: int = 42,
+    alpha: float = 10.0
 ) -> pd.DataFrame:
     """
     Simulate learning interactions for all users
 
-    Returns: 
-        DaataFrame of interaction logs
+    Runs the select_item / simulate_interaction model for every user inside
+    _simulate_users, on catalog arrays and random numbers drawn up front.
+    Interactions are written into one preallocated LOG_DTYPE buffer, which the
+    DataFrame is built from at the end. Users' mastery vectors are updated
+    with their final state: in place for a UsersTable, written back to each
+    user dict otherwise. Without Numba, _simulate_steps runs the same model
+    for all users a step at a time.
+
+    Returns:
+        DataFrame of interaction logs
     """
 
     rng = np.random.default_rng(seed)
-    logs = []
 
-    for user in users.values():
-        consecutive_failures = 0
+    user_table = users if isinstance(users, UsersTable) else UsersTable.from_dicts(users)
+    catalog = items if isinstance(items, ItemsTable) else ItemsTable.from_dicts(items)
 
-        for step in range(max_steps):
-            item = select_item(user, items, rng)
+    # Item scoring reads int8 difficulty as float32; the interaction model
+    # computes in float64, like the scalar model
+    difficulty = catalog.difficulty
+    estimated_time = catalog.estimated_time.astype(np.float64)
+    skills_normalized = catalog.skills / np.maximum(catalog.skill_count, 1)[:, None]
 
-            interaction = simulate_interaction(user, item, rng)
-            interaction["step"] = step
-            logs.append(interaction)
+    num_users = len(user_table.user_ids)
+    uniforms = rng.random((num_users, max_steps, 3))
+    normals = rng.standard_normal((num_users, max_steps, 2))
 
-            # Update failure count
-            if interaction["success"] == 0:
-                consecutive_failures += 1
-            else:
-                consecutive_failures = 0
-            
-            # Dropout check
-            dropout_prob = min(
-                1.0,
-                0.1 * consecutive_failures * user["dropout_sensitivity"]
-            )
+    skill_items_ptr, skill_items = _items_by_skill(catalog.skills)
+    prereq_items_ptr, prereq_items = _items_by_skill(catalog.prerequisites)
 
-            if rng.random() < dropout_prob:
-                break
-    
-    return pd.DataFrame(logs)
+    mastery = user_table.mastery
+    logs = np.empty(num_users * max_steps, dtype=LOG_DTYPE)
+    if not NUMBA_AVAILABLE:
+        lengths = _simulate_steps(logs, user_table, catalog, uniforms, normals, alpha)
+    else:
+        lengths = _simulate_users(
+            logs,
+            user_table.user_ids,
+            mastery,
+            user_table.learning_rate,
+            user_table.difficulty_tolerance,
+            user_table.dropout_sensitivity,
+            catalog.skills,
+            skills_normalized,
+            catalog.skill_count,
+            catalog.inv_skill_count,
+            catalog.item_ids,
+            difficulty,
+            catalog.num_prerequisites,
+            estimated_time,
+            catalog.prerequisites,
+            skill_items_ptr,
+            skill_items,
+            prereq_items_ptr,
+            prereq_items,
+            uniforms,
+            normals,
+            alpha,
+        )
 
+    if not isinstance(users, UsersTable):
+        for row, user_id in enumerate(user_table.user_ids):
+            users[int(user_id)]["mastery"] = mastery[row]
 
-from .users import generate_users
-from .items import generate_items
+    # Keep each user's steps, in user then step order. Each field is compacted
+    # into its own contiguous array, which the DataFrame adopts without
+    # another copy or consolidation into 2-D blocks
+    taken = (np.arange(max_steps)[None, :] < lengths[:, None]).ravel()
+    return pd.DataFrame({name: logs[name][taken] for name in LOG_DTYPE.names}, copy=False)
 
-def run_simulation(
+
+from .users import generate_users_table
+from .items import generate_items_table
+
+def run_simulation_tables(
     num_users: int,
     num_items: int,
     steps_per_user: int = 50,
     seed: int = 42
-):
-    users = generate_users(num_users)
-    items = generate_items(num_items)
+) -> Tuple[UsersTable, ItemsTable, pd.DataFrame]:
+    """
+    Generate users and items and simulate their interactions.
+
+    Returns:
+        (UsersTable, ItemsTable, logs); see run_simulation for the dict catalogs
+    """
+    users = generate_users_table(num_users)
+    items = generate_items_table(num_items)
 
     logs = run_simulation_core(
         users=users,
@@ -117,6 +486,23 @@ def run_simulation(
 
     return users, items, logs
 
+
+def run_simulation(
+    num_users: int,
+    num_items: int,
+    steps_per_user: int = 50,
+    seed: int = 42
+) -> Tuple[Dict[int, Dict], Dict[int, Dict], pd.DataFrame]:
+    """
+    Generate users and items and simulate their interactions.
+
+    Returns:
+        (users, items, logs) with user_id -> user dict and item_id -> item dict
+        catalogs; run_simulation_tables returns the same catalogs as arrays
+    """
+    users, items, logs = run_simulation_tables(num_users, num_items, steps_per_user, seed)
+    return users.to_dicts(), items.to_dicts(), logs
+
 # --------- Sanity Check ---------- #
 # from items import generate_items
 # from users import generate_users
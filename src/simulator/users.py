@@ -1,13 +1,15 @@
 import numpy as np
 from typing import Dict
 
-def generate_users(
+from ..catalog import UsersTable
+
+def generate_users_table(
     num_users: int,
     num_skills: int = 8,
     random_seed: int = 42
-) -> Dict[int, Dict]:
+) -> UsersTable:
     """
-    Generate a population of learners
+    Generate a population of learners as parallel arrays
 
     Each user has:
         - A master vector of skills
@@ -16,40 +18,51 @@ def generate_users(
         - A dropout sensitivity parameter
 
     Returns:
-        Dict[user_id, user_dict]
+        UsersTable with user ids 0..num_users-1
     """
 
     rng = np.random.default_rng(random_seed)
-    users = {}
+
+    # All randomness is drawn for the whole population at once
 
     # Parameters for initial mastery distribution
     alpha = 2.0
     beta = 5.0
 
-    for user_id in range(num_users):
-        # --------------
-        # Initial mastery
-        # --------------
-        mastery = rng.beta(alpha, beta, size=num_skills).astype(np.float32)
-
-        # ----------------------
-        # Learning behavior traits
-        # ----------------------
-        learning_rate = rng.uniform(0.05, 0.3)
-        difficulty_tolerance = rng.uniform(0.5, 1.5)
-        dropout_sensitivity = rng.uniform(0.0, 1.0)
-
-        user = {
-            "user_id": user_id,
-            "mastery": mastery,
-            "learning_rate": learning_rate,
-            "difficulty_tolerance": difficulty_tolerance,
-            "dropout_sensitivity": dropout_sensitivity
-        }
-
-        users[user_id] = user
-
-    return users
+    # --------------
+    # Initial mastery
+    # --------------
+    mastery = rng.beta(alpha, beta, size=(num_users, num_skills)).astype(np.float32)
+
+    # ----------------------
+    # Learning behavior traits
+    # ----------------------
+    learning_rate = rng.uniform(0.05, 0.3, size=num_users)
+    difficulty_tolerance = rng.uniform(0.5, 1.5, size=num_users)
+    dropout_sensitivity = rng.uniform(0.0, 1.0, size=num_users)
+
+    return UsersTable(
+        user_ids=np.arange(num_users, dtype=np.int64),
+        mastery=mastery,
+        learning_rate=learning_rate,
+        difficulty_tolerance=difficulty_tolerance,
+        dropout_sensitivity=dropout_sensitivity,
+        id_to_idx={user_id: user_id for user_id in range(num_users)},
+    )
+
+
+def generate_users(
+    num_users: int,
+    num_skills: int = 8,
+    random_seed: int = 42
+) -> Dict[int, Dict]:
+    """
+    Generate a population of learners in the dict format
+
+    Returns:
+        Dict[user_id, user_dict], built from generate_users_table
+    """
+    return generate_users_table(num_users, num_skills, random_seed).to_dicts()
 
 # -------- Sanity check --------- #
 # users = generate_users(3, 5)
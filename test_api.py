@@ -5,6 +5,7 @@ This script shows how to call the API endpoints
 
 import requests
 import json
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
 
@@ -35,6 +36,10 @@ def main():
     
     BASE_URL = "http://localhost:8000"
     
+    # One session for every call: connections are kept alive and reused
+    # instead of opening a new one per request
+    session = requests.Session()
+    
     print_header("LEARNING PATH RECOMMENDER API - TEST EXAMPLES")
     
     # Test 1: Health check
@@ -43,12 +48,13 @@ def main():
     print("Purpose: Check if API is running and models are loaded")
     
     try:
-        response = requests.get(f"{BASE_URL}/health")
+        response = session.get(f"{BASE_URL}/health")
         print_response(response, "Health Check Response")
     except requests.exceptions.ConnectionError:
         print("\n ERROR: Could not connect to API at http://localhost:8000")
         print("Make sure the API is running with:")
         print("  python -m uvicorn src.api:app --reload")
+        session.close()
         return
     
     # Test 2: Get recommendations for user 0
@@ -57,7 +63,7 @@ def main():
     print("Purpose: Get top-K recommended learning items for a specific user")
     
     try:
-        response = requests.get(f"{BASE_URL}/recommend/0")
+        response = session.get(f"{BASE_URL}/recommend/0")
         print_response(response, "Recommendations for User 0")
     except Exception as e:
         print(f"\n ERROR: {e}")
@@ -68,7 +74,7 @@ def main():
     print("Purpose: Get custom number of recommendations")
     
     try:
-        response = requests.get(f"{BASE_URL}/recommend/25", params={"top_k": 3})
+        response = session.get(f"{BASE_URL}/recommend/25", params={"top_k": 3})
         print_response(response, "Recommendations for User 25 (top_k=3)")
     except Exception as e:
         print(f"\n ERROR: {e}")
@@ -78,7 +84,7 @@ def main():
     print("Endpoint: GET /recommend/{user_id}")
     
     try:
-        response = requests.get(f"{BASE_URL}/recommend/49")
+        response = session.get(f"{BASE_URL}/recommend/49")
         print_response(response, "Recommendations for User 49")
     except Exception as e:
         print(f"\n ERROR: {e}")
@@ -89,7 +95,7 @@ def main():
     print("Expected: 404 Not Found")
     
     try:
-        response = requests.get(f"{BASE_URL}/recommend/999")
+        response = session.get(f"{BASE_URL}/recommend/999")
         print_response(response, "Error Response (Expected 404)")
     except Exception as e:
         print(f"\n ERROR: {e}")
@@ -98,9 +104,17 @@ def main():
     print_header("Test 6: Batch Test - Multiple Users")
     print("Getting recommendations for users 0-9")
     
+    def fetch(user_id: int) -> requests.Response:
+        return session.get(f"{BASE_URL}/recommend/{user_id}", params={"top_k": 3})
+    
     try:
-        for user_id in range(10):
-            response = requests.get(f"{BASE_URL}/recommend/{user_id}", params={"top_k": 3})
+        # Requests go out concurrently over the session's connection pool;
+        # results are printed in user order
+        user_ids = range(10)
+        with ThreadPoolExecutor(max_workers=len(user_ids)) as executor:
+            responses = list(executor.map(fetch, user_ids))
+        
+        for user_id, response in zip(user_ids, responses):
             if response.status_code == 200:
                 data = response.json()
                 num_recs = len(data.get("recommendations", []))
@@ -111,6 +125,8 @@ def main():
     except Exception as e:
         print(f"\n ERROR: {e}")
     
+    session.close()
+    
     print_header("API TEST COMPLETE")
     print("\nAPI Documentation (Swagger UI):")
     print(f"  {BASE_URL}/docs")
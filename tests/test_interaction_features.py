@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features.candidate_features import align_item_stats, candidate_feature_matrix
+from src.features.interaction_features import extract_interaction_features
+from src.features.item_features import extract_item_features
+from src.features.soa import build_soa
+from src.simulator.simulate import run_simulation
+
+
+def _reference_interaction_features(logs, users, items):
+    """The original row-by-row implementation, history by earlier index labels."""
+    features_list = []
+    for idx, row in logs.iterrows():
+        user_mastery = users[row["user_id"]]["mastery"]
+        item = items[row["item_id"]]
+        relevant_skills = item["skills"].astype(bool)
+        if relevant_skills.any():
+            skill_gap = np.mean(1.0 - user_mastery[relevant_skills])
+            fraction_skills_mastered = np.mean(user_mastery[relevant_skills] >= 0.8)
+        else:
+            skill_gap = 0.0
+            fraction_skills_mastered = 0.0
+
+        user_logs = logs[(logs["user_id"] == row["user_id"]) & (logs.index < idx)]
+        item_logs = logs[(logs["item_id"] == row["item_id"]) & (logs.index < idx)]
+        features_list.append({
+            "skill_gap": skill_gap,
+            "fraction_skills_mastered": fraction_skills_mastered,
+            "difficulty_gap": item["difficulty"] - np.mean(user_mastery) * 5,
+            # Expected gain on success, replacing the realized gain from the logs
+            "skill_gain": users[row["user_id"]]["learning_rate"] * skill_gap,
+            "user_success_rate": user_logs["success"].mean() if not user_logs.empty else 0.0,
+            "user_avg_quiz": user_logs["quiz_score"].mean() if not user_logs.empty else 0.0,
+            "user_avg_time": user_logs["time_spent"].mean() if not user_logs.empty else 0.0,
+            "user_num_attempts": len(user_logs),
+            "item_avg_success": item_logs["success"].mean() if not item_logs.empty else 0.0,
+            "item_avg_quiz": item_logs["quiz_score"].mean() if not item_logs.empty else 0.0,
+            "item_avg_time": item_logs["time_spent"].mean() if not item_logs.empty else 0.0,
+            "item_num_skills": int(np.sum(item["skills"])),
+        })
+
+    computed = pd.DataFrame(features_list, index=logs.index)
+    return pd.concat([logs.drop(columns=[c for c in logs.columns if c in computed]), computed], axis=1)
+
+
+@pytest.fixture(scope="module")
+def simulation():
+    return run_simulation(num_users=20, num_items=12, steps_per_user=15, seed=5)
+
+
+def _assert_features_close(features, expected):
+    assert list(features.columns) == list(expected.columns)
+    for column in expected.columns:
+        np.testing.assert_allclose(
+            features[column].to_numpy(float), expected[column].to_numpy(float),
+            rtol=1e-5, atol=1e-5, err_msg=column,
+        )
+
+
+@pytest.mark.parametrize("num_rows", [40, None])
+def test_matches_reference(simulation, num_rows):
+    # A short prefix of the log and the whole log
+    users, items, logs = simulation
+    logs = logs.iloc[:num_rows]
+
+    features = extract_interaction_features(logs, users, items)
+
+    _assert_features_close(features, _reference_interaction_features(logs, users, items))
+
+
+def test_history_follows_index_order(simulation):
+    users, items, logs = simulation
+    shuffled = logs.sample(frac=1.0, random_state=0)
+
+    features = extract_interaction_features(shuffled, users, items)
+
+    # Same features per interaction as in index order, returned in the caller's row order
+    _assert_features_close(features.sort_index(), extract_interaction_features(logs, users, items))
+
+
+def test_unknown_ids_raise(simulation):
+    users, items, logs = simulation
+    soa = build_soa(users, items)
+
+    np.testing.assert_array_equal(soa.item_index([3, 0, 11]), [3, 0, 11])
+    with pytest.raises(KeyError, match="item"):
+        soa.item_index([3, 12])
+    with pytest.raises(KeyError, match="user"):
+        soa.user_index(-1)
+
+    # An id between or past the catalog's ids must not be read as a neighbour's row
+    logs = logs.copy()
+    logs.loc[logs.index[-1], "item_id"] = 12
+    with pytest.raises(KeyError, match="item"):
+        extract_interaction_features(logs, users, items)
+
+
+def test_candidate_features_match_training_features(simulation):
+    # The API scores candidates with the catalog's (final) mastery, which the
+    # training features are computed from too; the item-side and skill columns
+    # must then agree with each training row
+    users, items, logs = simulation
+    soa = build_soa(users, items)
+    features = extract_interaction_features(logs, users, items, soa=soa)
+    item_stats = align_item_stats(extract_item_features(logs, items), soa)
+    columns = [
+        "skill_match", "difficulty", "num_prerequisites", "estimated_time", "skill_gain",
+        "skill_gap", "fraction_skills_mastered", "difficulty_gap", "item_num_skills",
+    ]
+
+    for user_id in [0, 7, 13]:
+        user = users[user_id]
+        user_stats = {
+            "learning_rate": user["learning_rate"], "dropout_sensitivity": user["dropout_sensitivity"],
+            "success_rate": 0.0, "avg_quiz": 0.0, "avg_time": 0.0, "num_attempts": 0,
+        }
+        candidates = candidate_feature_matrix(
+            soa.mastery[soa.user_index(user_id)], user_stats, soa, item_stats, columns
+        )
+
+        rows = features[features["user_id"] == user_id]
+        expected = rows[columns].to_numpy(np.float32)
+        # skill_match in the logs is taken before the interaction, from the
+        # mastery the user had then
+        candidate_rows = candidates[soa.item_index(rows["item_id"].to_numpy())]
+        np.testing.assert_allclose(candidate_rows[:, 1:], expected[:, 1:], rtol=1e-5, atol=1e-5)
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.pipeline.recommender import RecommenderSystem
+
+
+def _reference_recommend_batch(relevance_df, top_k, min_relevance):
+    """The original per-user loop: dict per user, stable sort by score."""
+    recommendations = []
+    for user_id in relevance_df['user_id'].unique():
+        user_items = relevance_df[relevance_df['user_id'] == user_id]
+        relevance = dict(zip(user_items['item_id'], user_items['relevance_score']))
+        candidates = [(item_id, score) for item_id, score in relevance.items() if score >= min_relevance]
+        candidates.sort(key=lambda x: x[1], reverse=True)
+        for rank, (item_id, score) in enumerate(candidates[:top_k], 1):
+            recommendations.append((user_id, item_id, score, rank))
+    return recommendations
+
+
+def _as_tuples(recommendations):
+    return list(recommendations[['user_id', 'item_id', 'relevance_score', 'rank']].itertuples(index=False, name=None))
+
+
+@pytest.mark.parametrize('top_k, min_relevance', [(5, 0.0), (3, 0.4), (50, 0.0)])
+def test_recommend_batch_matches_reference(top_k, min_relevance):
+    rng = np.random.default_rng(0)
+    n = 2000
+    relevance_df = pd.DataFrame({
+        'user_id': rng.integers(0, 40, size=n),
+        'item_id': rng.integers(0, 30, size=n),
+        # Coarse scores so ties and repeated (user, item) pairs are common
+        'relevance_score': rng.integers(0, 10, size=n) / 10.0,
+    })
+
+    recommender = RecommenderSystem(top_k=top_k, min_relevance=min_relevance)
+    result = recommender.recommend_batch(relevance_df, exclude_seen=False)
+
+    assert _as_tuples(result) == _reference_recommend_batch(relevance_df, top_k, min_relevance)
+
+
+def test_repeated_pair_keeps_first_position_and_last_score():
+    relevance_df = pd.DataFrame({
+        'user_id': [0, 0, 0, 1, 1],
+        'item_id': [1, 2, 1, 7, 7],
+        'relevance_score': [0.5, 0.5, 0.5, 0.9, 0.2],
+    })
+
+    result = RecommenderSystem(top_k=5).recommend_batch(relevance_df, exclude_seen=False)
+
+    assert _as_tuples(result) == [(0, 1, 0.5, 1), (0, 2, 0.5, 2), (1, 7, 0.2, 1)]
+
+
+def test_repeated_pair_last_score_applies_threshold():
+    relevance_df = pd.DataFrame({
+        'user_id': [0, 0, 0],
+        'item_id': [1, 2, 1],
+        'relevance_score': [0.9, 0.6, 0.1],
+    })
+
+    result = RecommenderSystem(top_k=5, min_relevance=0.5).recommend_batch(relevance_df, exclude_seen=False)
+
+    assert _as_tuples(result) == [(0, 2, 0.6, 1)]
+
+
+def test_exclude_seen_recommends_nothing():
+    relevance_df = pd.DataFrame({'user_id': [0, 1], 'item_id': [1, 2], 'relevance_score': [0.5, 0.7]})
+
+    result = RecommenderSystem().recommend_batch(relevance_df, exclude_seen=True)
+
+    assert len(result) == 0
+    assert list(result.columns) == ['user_id', 'item_id', 'relevance_score', 'rank']
+
+
+def test_recommend_orders_ties_by_insertion():
+    recommender = RecommenderSystem(top_k=3, min_relevance=0.2)
+    relevance = {4: 0.5, 9: 0.8, 2: 0.5, 7: 0.1, 5: 0.5}
+
+    assert recommender.recommend(0, relevance, exclude_items={9}) == [(4, 0.5), (2, 0.5), (5, 0.5)]
@@ -0,0 +1,258 @@
+import copy
+import os
+import pickle
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.catalog import ItemsTable
+from src.features.interaction_features import extract_interaction_features
+from src.simulator.interactions import RandomPool, simulate_core, simulate_interaction
+from src.simulator import simulate
+from src.simulator.items import generate_items
+from src.simulator.simulate import run_simulation, run_simulation_core, select_item
+from src.simulator.users import generate_users
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+EXACT_COLUMNS = ["user_id", "item_id", "success", "difficulty", "num_prerequisites", "step"]
+FLOAT_COLUMNS = [
+    "quiz_score", "time_spent", "skill_match", "difficulty_gap",
+    "dropout_sensitivity", "estimated_time", "skill_gain",
+]
+
+
+def _reference_select_row(mastery, items, u01):
+    """
+    Item selection: prefer slightly challenging items whose prerequisites are
+    met (any item if none are), sampled with the uniform draw u01
+    """
+    item_ids = sorted(items)
+    allowed = np.array([
+        all(mastery[k] >= 0.6 for k in items[item_id]["prerequisites"]) for item_id in item_ids
+    ])
+    if not allowed.any():
+        allowed[:] = True
+    weights = np.zeros(len(item_ids))
+    for row, item_id in enumerate(item_ids):
+        skills = items[item_id]["skills"]
+        count = np.count_nonzero(skills)
+        avg_mastery = mastery[skills > 0].sum() / count if count else 0.0
+        if allowed[row]:
+            weights[row] = np.exp(-abs(items[item_id]["difficulty"] - (avg_mastery * 5 + 1)))
+    cumulative = np.cumsum(weights)
+    picked = np.flatnonzero((weights > 0) & (cumulative > u01 * cumulative[-1]))
+    return picked[0] if len(picked) else np.flatnonzero(weights)[-1]
+
+
+def _reference_simulation(users, items, max_steps, seed, alpha=10.0):
+    """
+    Plain-Python version of the simulation model, one dict lookup at a time
+
+    Draws the same random numbers as run_simulation_core: per (user, step),
+    uniforms select the item, decide success and check dropout; normals are
+    the quiz and time noise.
+    """
+    rng = np.random.default_rng(seed)
+    user_ids = sorted(users)
+    item_ids = sorted(items)
+    uniforms = rng.random((len(user_ids), max_steps, 3))
+    normals = rng.standard_normal((len(user_ids), max_steps, 2))
+
+    rows = []
+    for u, user_id in enumerate(user_ids):
+        user = users[user_id]
+        mastery = user["mastery"]
+        consecutive_failures = 0
+
+        for step in range(max_steps):
+            item = items[item_ids[_reference_select_row(mastery, items, uniforms[u, step, 0])]]
+
+            # Interaction
+            skills = item["skills"]
+            count = np.count_nonzero(skills)
+            skill_match = float(mastery @ skills) / count if count else 0.0
+            difficulty_gap = item["difficulty"] / user["difficulty_tolerance"]
+            success_prob = 1.0 / (1.0 + np.exp(-(alpha * skill_match - difficulty_gap)))
+            success = uniforms[u, step, 1] < success_prob
+
+            if success:
+                quiz_score = 80 + 20 * skill_match + 5 * normals[u, step, 0]
+                time_spent = item["estimated_time"] * (1.0 + 0.1 * difficulty_gap)
+            else:
+                quiz_score = 40 + 20 * skill_match + 10 * normals[u, step, 0]
+                time_spent = item["estimated_time"] * (1.5 + 0.2 * difficulty_gap)
+            quiz_score = min(max(quiz_score, 0.0), 100.0)
+            time_spent = max(1.0, time_spent + 2 * normals[u, step, 1])
+
+            skill_gain = 0.0
+            if success:
+                before = mastery.copy()
+                after = before + user["learning_rate"] * skills * (1.0 - before)
+                mastery[:] = np.clip(after, 0.0, 1.0)
+                if count:
+                    skill_gain = min(max(float((mastery - before)[skills > 0].sum()) / count, 0.0), 1.0)
+
+            rows.append({
+                "user_id": user_id,
+                "item_id": item["item_id"],
+                "success": int(success),
+                "quiz_score": quiz_score,
+                "time_spent": time_spent,
+                "skill_match": skill_match,
+                "difficulty_gap": difficulty_gap,
+                "difficulty": item["difficulty"],
+                "dropout_sensitivity": user["dropout_sensitivity"],
+                "num_prerequisites": len(item["prerequisites"]),
+                "estimated_time": item["estimated_time"],
+                "skill_gain": skill_gain,
+                "step": step,
+            })
+
+            consecutive_failures = 0 if success else consecutive_failures + 1
+            dropout_prob = min(1.0, 0.1 * consecutive_failures * user["dropout_sensitivity"])
+            if uniforms[u, step, 2] < dropout_prob:
+                break
+
+    return pd.DataFrame(rows)
+
+
+def _assert_logs_close(logs, expected):
+    assert list(logs.columns) == list(expected.columns)
+    for column in EXACT_COLUMNS:
+        np.testing.assert_array_equal(logs[column].to_numpy(), expected[column].to_numpy(), err_msg=column)
+    for column in FLOAT_COLUMNS:
+        np.testing.assert_allclose(
+            logs[column].to_numpy(), expected[column].to_numpy(), rtol=1e-5, atol=1e-5, err_msg=column
+        )
+
+
+@pytest.mark.parametrize("compiled", [True, False], ids=["kernel", "numpy"])
+@pytest.mark.parametrize("seed", [0, 7])
+def test_simulation_matches_reference(seed, compiled, monkeypatch):
+    # The NumPy path is the one taken when Numba is not installed
+    monkeypatch.setattr(simulate, "NUMBA_AVAILABLE", simulate.NUMBA_AVAILABLE and compiled)
+    users = generate_users(25, random_seed=seed)
+    items = generate_items(15, random_seed=seed)
+    reference_users = copy.deepcopy(users)
+
+    logs = run_simulation_core(users, items, max_steps=20, seed=seed)
+    expected = _reference_simulation(reference_users, items, max_steps=20, seed=seed)
+
+    _assert_logs_close(logs, expected)
+    for user_id, user in users.items():
+        np.testing.assert_allclose(user["mastery"], reference_users[user_id]["mastery"], rtol=1e-5, atol=1e-6)
+
+
+def test_select_item_matches_reference():
+    users = generate_users(40, random_seed=4)
+    items = generate_items(20, random_seed=4)
+    catalog = ItemsTable.from_dicts(items)
+    rng = np.random.default_rng(0)
+    reference_rng = np.random.default_rng(0)
+
+    for user in users.values():
+        row = select_item(user, catalog, rng)
+
+        assert row == _reference_select_row(user["mastery"], items, reference_rng.random())
+
+
+@pytest.mark.parametrize("return_extended", [False, True])
+def test_simulate_interaction_wraps_simulate_core(return_extended):
+    users = generate_users(6, random_seed=1)
+    items = generate_items(6, random_seed=1)
+    reference_users = copy.deepcopy(users)
+    rng = np.random.default_rng(2)
+    reference_rng = np.random.default_rng(2)
+
+    for user_id, item_id in [(0, 1), (0, 1), (3, 5), (5, 0)]:
+        record = simulate_interaction(users[user_id], items[item_id], rng, return_extended=return_extended)
+
+        user, item = reference_users[user_id], items[item_id]
+        draws = reference_rng.random(), reference_rng.standard_normal(), reference_rng.standard_normal()
+        success, quiz_score, time_spent, skill_match, difficulty_gap, skill_gain = simulate_core(
+            user["mastery"], item["skills"], item["skills"] / max(np.count_nonzero(item["skills"]), 1),
+            np.count_nonzero(item["skills"]), user["learning_rate"], user["difficulty_tolerance"],
+            float(item["difficulty"]), item["estimated_time"], *draws, 10.0,
+        )
+
+        expected = {
+            "user_id": user_id, "item_id": item_id, "success": int(success), "quiz_score": quiz_score,
+            "time_spent": time_spent, "skill_match": skill_match, "difficulty_gap": difficulty_gap,
+        }
+        if return_extended:
+            expected.update({
+                "difficulty": item["difficulty"], "dropout_sensitivity": user["dropout_sensitivity"],
+                "num_prerequisites": len(item["prerequisites"]), "estimated_time": item["estimated_time"],
+                "skill_gain": skill_gain,
+            })
+        assert record == pytest.approx(expected)
+        np.testing.assert_allclose(users[user_id]["mastery"], user["mastery"], rtol=1e-6)
+
+
+def test_random_pool_reads_generator_blocks():
+    pool = RandomPool(np.random.default_rng(3), block_size=4)
+    uniforms = [pool.random() for _ in range(6)]
+    normals = [pool.standard_normal() for _ in range(3)] + [pool.normal(10.0, 2.0)]
+
+    # Blocks are drawn lazily, each kind when it runs out
+    rng = np.random.default_rng(3)
+    expected_uniforms = np.concatenate([rng.random(4), rng.random(4)])[:6]
+    expected_normals = rng.standard_normal(4)
+    expected_normals[3] = 10.0 + 2.0 * expected_normals[3]
+    assert uniforms == expected_uniforms.tolist()
+    np.testing.assert_allclose(normals, expected_normals)
+
+    users = generate_users(1, random_seed=3)
+    items = generate_items(1, random_seed=3)
+    record = simulate_interaction(users[0], items[0], pool, return_extended=True)
+    assert 0.0 <= record["quiz_score"] <= 100.0
+    assert record["time_spent"] >= 1.0
+
+
+def test_run_simulation_returns_dict_catalogs():
+    users, items, logs = run_simulation(num_users=10, num_items=8, steps_per_user=5, seed=3)
+
+    assert len(users) == 10
+    assert len(items) == 8
+    assert users[0]["mastery"].shape == items[0]["skills"].shape
+    assert set(logs["user_id"]) <= set(users)
+    assert set(logs["item_id"]) <= set(items)
+
+
+_NO_JIT_SCRIPT = """
+import pickle, sys
+from src.simulator.simulate import run_simulation
+from src.catalog import ItemsTable
+from src.features.interaction_features import extract_interaction_features
+users, items, logs = run_simulation(num_users=20, num_items=15, steps_per_user=20, seed=11)
+features = extract_interaction_features(logs, users, items)
+pickle.dump((logs, features), open(sys.argv[1], "wb"))
+"""
+
+
+def test_compiled_kernels_match_python(tmp_path):
+    pytest.importorskip("numba")
+
+    out = tmp_path / "no_jit.pkl"
+    env = dict(os.environ, NUMBA_DISABLE_JIT="1")
+    subprocess.run(
+        [sys.executable, "-c", _NO_JIT_SCRIPT, str(out)], cwd=PROJECT_ROOT, env=env, check=True
+    )
+    with open(out, "rb") as f:
+        expected_logs, expected_features = pickle.load(f)
+
+    users, items, logs = run_simulation(num_users=20, num_items=15, steps_per_user=20, seed=11)
+    features = extract_interaction_features(logs, users, items)
+
+    # fastmath lets compiled float reductions differ in the last bits
+    _assert_logs_close(logs, expected_logs)
+    assert list(features.columns) == list(expected_features.columns)
+    for column in features.columns:
+        np.testing.assert_allclose(
+            features[column].to_numpy(float), expected_features[column].to_numpy(float),
+            rtol=1e-5, atol=1e-5, err_msg=column,
+        )
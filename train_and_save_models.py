@@ -11,7 +11,7 @@ PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__)))
 SRC_PATH = os.path.join(PROJECT_ROOT, "src")
 sys.path.insert(0, SRC_PATH)
 
-from src.simulator.simulate import run_simulation
+from src.simulator.simulate import run_simulation_tables
 from src.pipeline import LearningPathPipeline
 from src.model.persistence import ModelPersistence, save_pipeline_models
 from src.config import (
@@ -29,13 +29,13 @@ def main():
     
     # Step 1: Generate synthetic data
     print("\n[Step 1] Generating synthetic data...")
-    users, items, logs = run_simulation(
+    users, items, logs = run_simulation_tables(
         num_users=NUM_USERS,
         num_items=NUM_ITEMS,
         steps_per_user=STEPS_PER_USER,
         seed=RANDOM_SEED
     )
-    print(f"   Generated {len(users)} users, {len(items)} items, {len(logs)} interactions")
+    print(f"   Generated {len(users.user_ids)} users, {len(items.item_ids)} items, {len(logs)} interactions")
     
     # Step 2: Run pipeline
     print("\n[Step 2] Running recommendation pipeline...")